@@ -1,3 +1,5 @@
+import time
+DEBUT_DEMARRAGE = time.perf_counter()
 import sys
 import csv
 import logging
@@ -20,34 +22,94 @@ from PyQt5.QtCore import Qt, QDate, QTimer,QThread, pyqtSignal
 from PyQt5.QtGui import QPixmap, QIcon,QPainter, QBrush,QPen,QColor, QFont,QPainterPath,QStandardItemModel, QStandardItem
 
 
-
-
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 from onda_db import DBaircraft
 from onda_config import Params
-from onda_optimise import  OptimiseurGP 
-from onda_simulation import (Simulate_uniforme, Simulate_normale,
-                       Simulate_poisson, Simulate_binomialnegatif,Simulate_beta, Simulate_bimodal,
-                       Simulate_lognormale, Simulate_gamma, Simulate_weibull,
-                       Simulate_trimodal, Simulate_pareto)
+# matplotlib et les modules de simulation (numpy) sont importés au premier usage
+DUREE_IMPORTS = time.perf_counter() - DEBUT_DEMARRAGE
+
+
+def create_figure(**kwargs):
+    """Crée une figure matplotlib et son canvas Qt (matplotlib est importé au premier graphique)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    fig = Figure(**kwargs)
+    return fig, FigureCanvas(fig)
+
+def setp(*args, **kwargs):
+    """matplotlib.artist.setp, importé au premier usage"""
+    from matplotlib.artist import setp
+    return setp(*args, **kwargs)
 
 
 class SimulationApp(QMainWindow):
     def __init__(self):
+        debut = time.perf_counter()
         super().__init__()
         self.setWindowTitle("Simulation de Flux de bagages Aéroportuaire")
         self.setGeometry(100, 100, 1200, 800)
+        self.startup_timings = {"imports": DUREE_IMPORTS}
        
         # Paramètres par défaut
+        etape = time.perf_counter()
         self.params = Params()
-        self.db = DBaircraft(self.params.db_path)
+        self.db = DBaircraft(self.params.db_path, cache=self.params.db_cache)
+        self.charger_topologie()
+        self.startup_timings["parametres"] = time.perf_counter() - etape
        
         # Création de l'interface
+        etape = time.perf_counter()
         self.setup_icons()
         self.setup_styles()
         self.initUI()
+        self.startup_timings["interface"] = time.perf_counter() - etape - self.startup_timings.get("compagnies", 0)
+        self.startup_timings["application"] = time.perf_counter() - debut
+        self.print_startup_timings()
+
+    def print_startup_timings(self):
+        """Affiche le temps de démarrage par étape, pour suivre les régressions"""
+        details = ", ".join(f"{etape} {duree:.3f} s" for etape, duree in self.startup_timings.items())
+        print(f"Démarrage : {details} (total depuis le lancement {time.perf_counter() - DEBUT_DEMARRAGE:.3f} s)")
+
+    def charger_topologie(self):
+        """
+        Lit une fois la topologie des carrousels simulés : config.json (carousels.zones)
+        complété par la table compagnies, comme Simulate.init_db.
+        Relue seulement quand la table compagnies est modifiée depuis l'interface.
+        """
+        self.topologie_zones = self.params.fusionner_zones(self.db.get_zones())
+        self.topologie = [(caroussel, zone, rang)
+                          for zone, caroussels in self.topologie_zones.items()
+                          for rang, caroussel in enumerate(caroussels, 1)]
+
+    def get_zones(self):
+        """Topologie {zone: [carrousels]} des carrousels simulés"""
+        return {zone: list(caroussels) for zone, caroussels in self.topologie_zones.items()}
+
+    def get_caroussels(self):
+        """[(carrousel, zone, rang dans la zone)] dans l'ordre des zones"""
+        return list(self.topologie)
+
+    def get_caroussel_combo(self, combo):
+        """Carrousel choisi dans un combo rempli par add_caroussels_combo (None pour les autres entrées)"""
+        return combo.currentData()
+
+    def add_caroussels_combo(self, combo, entrees=(), prefixe=""):
+        """
+        Remplit un combo : entrées fixes (sans carrousel) puis un libellé par carrousel,
+        le numéro du carrousel étant stocké dans la donnée de l'élément
+        """
+        for entree in entrees:
+            combo.addItem(entree, None)
+        for (caroussel, _, _), libelle in zip(self.topologie, self.get_caroussels_libelles()):
+            combo.addItem(f"{prefixe}{libelle}", caroussel)
+
+    def libelle_caroussel(self, caroussel, zone, rang):
+        """Libellé 'Zone A-1' d'un carrousel ('Carrousel 7' s'il n'a pas de zone)"""
+        return f"Zone {zone}-{rang}" if zone is not None else f"Carrousel {caroussel}"
+
+    def get_caroussels_libelles(self):
+        """Libellés des carrousels, dans l'ordre de get_caroussels()"""
+        return [self.libelle_caroussel(*caroussel) for caroussel in self.topologie]
 
     def setup_icons(self):
         self.icons = {
@@ -105,17 +167,28 @@ class SimulationApp(QMainWindow):
         # Création des paramètres
         self.create_params(main_layout)
 
-        # Graphiques
-        self.fig = Figure(figsize=(10, 8))
-        self.canvas = FigureCanvas(self.fig)
-        self.canvas.setVisible(False)
-        main_layout.addWidget(self.canvas)
+        # Graphiques (créés à la première simulation)
+        self.main_layout = main_layout
+        self.fig = None
+        self.canvas = None
 
         # Configurer les connexions entre les signaux et slots
         self.setup_connections()  
 
         # Charger les compagnies initiales
+        etape = time.perf_counter()
         self.update_compagnies()  
+        self.startup_timings["compagnies"] = time.perf_counter() - etape
+
+    def get_main_canvas(self):
+        """Retourne le canvas principal, créé au premier affichage"""
+        if self.canvas is None:
+            etape = time.perf_counter()
+            self.fig, self.canvas = create_figure(figsize=(10, 8))
+            self.canvas.setVisible(False)
+            self.main_layout.addWidget(self.canvas)
+            print(f"Création du graphique principal : {time.perf_counter() - etape:.3f} s")
+        return self.canvas
 
     def create_boutons(self, main_layout):
         """Crée les boutons"""
@@ -437,22 +510,14 @@ class SimulationApp(QMainWindow):
         self.bagages_check.setChecked(False)
         graphs_layout.addWidget(self.bagages_check)
 
-        self.tapis_check1 = QCheckBox("Zone A Caroussel 1")
-        self.tapis_check1.setChecked(False)
-        graphs_layout.addWidget(self.tapis_check1)
-        self.tapis_check2 = QCheckBox("Zone A Caroussel 2")
-        self.tapis_check2.setChecked(False)
-        graphs_layout.addWidget(self.tapis_check2)
-
-        self.tapis_check3 = QCheckBox("Zone B Caroussel 1")
-        self.tapis_check3.setChecked(False)
-        graphs_layout.addWidget(self.tapis_check3)
-        self.tapis_check4 = QCheckBox("Zone B Caroussel 2")
-        self.tapis_check4.setChecked(False)
-        graphs_layout.addWidget(self.tapis_check4)
-        self.tapis_check5 = QCheckBox("Zone B Caroussel 3")
-        self.tapis_check5.setChecked(False)
-        graphs_layout.addWidget(self.tapis_check5)
+        # Une case par carrousel de la topologie : [(carrousel, libellé, case)]
+        self.tapis_checks = []
+        for caroussel, zone, rang in self.get_caroussels():
+            libelle = f"Zone {zone} caroussel {rang}" if zone is not None else f"Caroussel {caroussel}"
+            tapis_check = QCheckBox(libelle)
+            tapis_check.setChecked(False)
+            graphs_layout.addWidget(tapis_check)
+            self.tapis_checks.append((caroussel, libelle, tapis_check))
        
         self.graphs_group.setFixedHeight(80)
         self.graphs_group.setLayout(graphs_layout)
@@ -1104,12 +1169,14 @@ class SimulationApp(QMainWindow):
         fig = self.canvas
         if group.isVisible():
             group.setVisible(False)
-            fig.setVisible(True)
+            if fig is not None:
+                fig.setVisible(True)
             button.setIcon(self.icons['expand'])
             button.setText(" Paramètres")
         else:
             group.setVisible(True)
-            fig.setVisible(False)
+            if fig is not None:
+                fig.setVisible(False)
             button.setIcon(self.icons['collapse'])
             button.setText(" Masquer")
        
@@ -1359,99 +1426,56 @@ class SimulationApp(QMainWindow):
     def run_simulation(self):
         sim_type=self.get_curent_simulation()
         self.params_globaux_group.setVisible(False)
-        self.canvas.setVisible(True)
+        self.get_main_canvas().setVisible(True)
         result,data,sim=self.calcul_simulation(sim_type)
         self.draw_graph_simulation(sim_type,result,data)
 
     def calcul_simulation(self, sim_type,params=None):
+        from onda_simulation import SIMULATIONS, create_simulation
         if params is None:
             self.update_params()
             params=self.params
        
-        if sim_type == "uniform":
-            sim = Simulate_uniforme(params)
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
-        elif sim_type == "normal":
-            sim = Simulate_normale(params, sigma_minutes=self.sigma_spin.value())
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+        if sim_type not in SIMULATIONS:
+            return
+        sim = create_simulation(sim_type, params, **self.get_simulation_kwargs(sim_type, params))
+        result = sim.run()
+        data = sim.simulate(result)
+        return result, data, sim
+
+    def get_simulation_kwargs(self, sim_type, params):
+        """Paramètres de la distribution sélectionnée (valeurs de l'interface ou des paramètres)"""
+        if sim_type == "normal":
+            return {"sigma_minutes": self.sigma_spin.value()}
         elif sim_type == "poisson":
-            sim = Simulate_poisson(params, lambda_param=self.lambda_spin.value())
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"lambda_param": self.lambda_spin.value()}
         elif sim_type == "binomialnegatif":
-            sim = Simulate_binomialnegatif(params, mu=self.mu_spin.value(), k=self.k_spin.value())
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"mu": self.mu_spin.value(), "k": self.k_spin.value()}
         elif sim_type == "beta":
-            sim = Simulate_beta(params, alpha=self.alpha_spin.value(), beta=self.beta_spin.value())
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"alpha": self.alpha_spin.value(), "beta": self.beta_spin.value()}
         elif sim_type == "bimodal":
-            early_weight = self.early_weight_slider.value() / 100
-            sim = Simulate_bimodal(
-                params,
-                early_mean=self.early_mean_spin.value(),
-                early_std=self.early_std_spin.value(),
-                late_mean=self.late_mean_spin.value(),
-                late_std=self.late_std_spin.value(),
-                early_weight=early_weight
-            )
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {
+                "early_mean": self.early_mean_spin.value(),
+                "early_std": self.early_std_spin.value(),
+                "late_mean": self.late_mean_spin.value(),
+                "late_std": self.late_std_spin.value(),
+                "early_weight": self.early_weight_slider.value() / 100
+            }
         elif sim_type == "lognormal":
-            sim = Simulate_lognormale(
-                params,
-                mu=params.default_lognormal_mu,
-                sigma=params.default_lognormal_sigma
-            )
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"mu": params.default_lognormal_mu, "sigma": params.default_lognormal_sigma}
         elif sim_type == "gamma":
-            sim = Simulate_gamma(
-                params,
-                shape=params.default_gamma_shape,
-                scale=params.default_gamma_scale
-            )
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"shape": params.default_gamma_shape, "scale": params.default_gamma_scale}
         elif sim_type == "weibull":
-            sim = Simulate_weibull(
-                params,
-                shape=params.default_weibull_shape,
-                scale=params.default_weibull_scale
-            )
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"shape": params.default_weibull_shape, "scale": params.default_weibull_scale}
         elif sim_type == "trimodal":
-            sim = Simulate_trimodal(
-                params,
-                means=params.default_trimodal_means,
-                stds=params.default_trimodal_stds,
-                weights=params.default_trimodal_weights
-            )
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {
+                "means": params.default_trimodal_means,
+                "stds": params.default_trimodal_stds,
+                "weights": params.default_trimodal_weights
+            }
         elif sim_type == "pareto":
-            sim = Simulate_pareto(
-                params,
-                alpha=params.default_pareto_alpha,
-                scale=params.default_pareto_scale
-            )
-            result = sim.run()
-            data = sim.simulate(result)
-            return result, data, sim
+            return {"alpha": params.default_pareto_alpha, "scale": params.default_pareto_scale}
+        return {}
 
     def draw_graph_simulation(self, sim_type,result,data):
        
@@ -1481,9 +1505,9 @@ class SimulationApp(QMainWindow):
             return
         self.plot_results(self.fig, result,data, title,
                              self.vols_check,self.manutentionnaires_check,self.enregistrements_check, self.voyageurs_check, self.bagages_check,
-                             self.tapis_check1,self.tapis_check2,self.tapis_check3,self.tapis_check4,self.tapis_check5)
+                             self.tapis_checks)
 
-    def plot_results(self, fig, results, data, title,vols_check,manutentionnaires_check, enregistrements_check, voyageurs_check, bagages_check, tapis_check1,tapis_check2,tapis_check3,tapis_check4,tapis_check5):
+    def plot_results(self, fig, results, data, title,vols_check,manutentionnaires_check, enregistrements_check, voyageurs_check, bagages_check, tapis_checks):
         """Affiche les résultats dans une figure matplotlib selon les cases cochées"""
         fig.clear()
        
@@ -1500,8 +1524,8 @@ class SimulationApp(QMainWindow):
                 simplified_times.append("")
        
         # Déterminer le nombre de graphes à afficher
-        num_plots = sum([vols_check.isChecked(),manutentionnaires_check.isChecked(),enregistrements_check.isChecked(), voyageurs_check.isChecked(), bagages_check.isChecked(),
-                        tapis_check1.isChecked(),tapis_check2.isChecked(),tapis_check3.isChecked(),tapis_check4.isChecked(),tapis_check5.isChecked()])
+        num_plots = sum([vols_check.isChecked(),manutentionnaires_check.isChecked(),enregistrements_check.isChecked(), voyageurs_check.isChecked(), bagages_check.isChecked()]
+                        + [tapis_check.isChecked() for _, _, tapis_check in tapis_checks])
         if num_plots == 0:
             return
 
@@ -1601,43 +1625,24 @@ class SimulationApp(QMainWindow):
             plot_index += 1
        
         # Graphique des tapis
-        if tapis_check1.isChecked():
-            ax = fig.add_subplot(num_plots, 1, plot_index)
-            tapis='Zone A caroussel 1'
-            self.draw_graph_caroussel(tapis,title,simplified_times,fig,ax,data["caroussel_1"])
-            plot_index += 1
-        if tapis_check2.isChecked():
-            ax = fig.add_subplot(num_plots, 1, plot_index)
-            tapis='Zone A caroussel 2'
-            self.draw_graph_caroussel(tapis,title,simplified_times,fig,ax,data["caroussel_2"])
-            plot_index += 1
-        if tapis_check3.isChecked():
-            ax = fig.add_subplot(num_plots, 1, plot_index)
-            tapis='Zone B caroussel 1'
-            self.draw_graph_caroussel(tapis,title,simplified_times,fig,ax,data["caroussel_3"])
-            plot_index += 1
-        if tapis_check4.isChecked():
-            ax = fig.add_subplot(num_plots, 1, plot_index)
-            tapis='Zone B caroussel 2'
-            self.draw_graph_caroussel(tapis,title,simplified_times,fig,ax,data["caroussel_4"])
-            plot_index += 1
-        if tapis_check5.isChecked():
-            ax = fig.add_subplot(num_plots, 1, plot_index)
-            tapis='Zone B caroussel 3'
-            self.draw_graph_caroussel(tapis,title,simplified_times,fig,ax,data["caroussel_5"])
-            plot_index += 1
+        for caroussel, tapis, tapis_check in tapis_checks:
+            if tapis_check.isChecked():
+                ax = fig.add_subplot(num_plots, 1, plot_index)
+                self.draw_graph_caroussel(tapis,title,simplified_times,fig,ax,data[f"caroussel_{caroussel}"],caroussel)
+                plot_index += 1
 
         fig.tight_layout()
         fig.canvas.draw()
 
 
 
-    def draw_graph_caroussel(self,tapis,title,simplified_times,fig,ax,data):
+    def draw_graph_caroussel(self,tapis,title,simplified_times,fig,ax,data,caroussel):
         line_rejet, =ax.plot(data['times'], data['Bagages_rejetes'], label='Bagages rejeté', color='red')
         line_tratement, = ax.plot(data["times"], data['Bagages_sur_tapis'], label='Bagages sur tapis', color='blue')
        
-        capacite_longueur = self.params.longueur_max / self.params.longueur_moyenne_bagage
-        capacite_poids = self.params.poids_max / self.params.poids_moyen_bagage
+        poids_max, longueur_max, _ = self.params.capacite(caroussel)
+        capacite_longueur = longueur_max / self.params.longueur_moyenne_bagage
+        capacite_poids = poids_max / self.params.poids_moyen_bagage
         ax.axhline(y=capacite_longueur, color='orange', linestyle='--', label='Capacité max (longueur)')
         ax.axhline(y=capacite_poids, color='purple', linestyle='--', label='Capacité max (poids)')
        
@@ -1693,32 +1698,14 @@ class SimulationApp(QMainWindow):
            
             with open(filename, 'w', newline='') as csvfile:
                 writer = csv.writer(csvfile, delimiter=';')
+                series = ['Bagages_sur_tapis', 'Poids_sur_tapis', 'Longueur_sur_tapis', 'Bagages_rejetes',
+                          'Echec', 'Poids_depasse', 'Longueur_depasse']
+                caroussels = [f"caroussel_{caroussel}" for caroussel in sim.caroussels]
                 writer.writerow(['Heure',
                                 'Enregistrements',
                                 'Voyageurs',
-                                'Bagages',
-                                'caroussel_1_Bagages_sur_tapis',
-                                'caroussel_1_Poids_sur_tapis',
-                                'caroussel_1_Longueur_sur_tapis',
-                                'caroussel_1_Bagages_rejetes',
-                                'caroussel_1_Echec',
-                                'caroussel_1_Poids_depasse',
-                                'caroussel_1_Longueur_depasse',
-                                'caroussel_2_Bagages_sur_tapis',
-                                'caroussel_2_Poids_sur_tapis',
-                                'caroussel_2_Longueur_sur_tapis',
-                                'caroussel_2_Bagages_rejetes',
-                                'caroussel_2_Echec',
-                                'caroussel_2_Poids_depasse',
-                                'caroussel_2_Longueur_depasse',
-                                'caroussel_3_Bagages_sur_tapis',
-                                'caroussel_3_Poids_sur_tapis',
-                                'caroussel_3_Longueur_sur_tapis',
-                                'caroussel_3_Bagages_rejetes',
-                                'caroussel_3_Echec',
-                                'caroussel_3_Poids_depasse',
-                                'caroussel_3_Longueur_depasse'
-                                ])
+                                'Bagages'
+                                ] + [f"{caroussel}_{serie}" for caroussel in caroussels for serie in series])
                 enregistrements=[len(result) for result in results["enregistrements"]]
                 voyageurs=[len(result) for result in results["voyageurs"]]
                 bagages=[sum(bagage[1] for bagage in result) for result in results["bagages"]]
@@ -1727,29 +1714,8 @@ class SimulationApp(QMainWindow):
                                     results["times"][i],
                                     enregistrements[i],
                                     voyageurs[i],
-                                    bagages[i],
-                                    data["caroussel_1"]["Bagages_sur_tapis"][i],
-                                    data["caroussel_1"]["Poids_sur_tapis"][i],
-                                    data["caroussel_1"]["Longueur_sur_tapis"][i],
-                                    data["caroussel_1"]["Bagages_rejetes"][i],
-                                    data["caroussel_1"]["Echec"][i],
-                                    data["caroussel_1"]["Poids_depasse"][i],
-                                    data["caroussel_1"]["Longueur_depasse"][i],
-                                    data["caroussel_2"]["Bagages_sur_tapis"][i],
-                                    data["caroussel_2"]["Poids_sur_tapis"][i],
-                                    data["caroussel_2"]["Longueur_sur_tapis"][i],
-                                    data["caroussel_2"]["Bagages_rejetes"][i],
-                                    data["caroussel_2"]["Echec"][i],
-                                    data["caroussel_2"]["Poids_depasse"][i],
-                                    data["caroussel_2"]["Longueur_depasse"][i],
-                                    data["caroussel_3"]["Bagages_sur_tapis"][i],
-                                    data["caroussel_3"]["Poids_sur_tapis"][i],
-                                    data["caroussel_3"]["Longueur_sur_tapis"][i],
-                                    data["caroussel_3"]["Bagages_rejetes"][i],
-                                    data["caroussel_3"]["Echec"][i],
-                                    data["caroussel_3"]["Poids_depasse"][i],
-                                    data["caroussel_3"]["Longueur_depasse"][i]
-                                    ])
+                                    bagages[i]
+                                    ] + [data[caroussel][serie][i] for caroussel in caroussels for serie in series])
 #-----------------------------------------------------------------------------------------------
     def visualise_simulation(self):
         # Récupérer les données de simulation
@@ -1773,7 +1739,7 @@ class SimulationApp(QMainWindow):
        
         carrousel_layout.addWidget(QLabel("Carrousel:"))
         self.carrousel_combo = QComboBox()
-        self.carrousel_combo.addItems(["Zone A-1", "Zone A-2", "Zone B-1", "Zone B-2", "Zone B-3"])
+        self.add_caroussels_combo(self.carrousel_combo)
         carrousel_layout.addWidget(self.carrousel_combo)
        
         # Slider pour contrôler le temps
@@ -1823,8 +1789,7 @@ class SimulationApp(QMainWindow):
         # Graphique de charge du carrousel (1/4 de l'espace)
         charge_container = QWidget()
         charge_container_layout = QVBoxLayout(charge_container)
-        self.charge_fig = Figure()
-        self.charge_canvas = FigureCanvas(self.charge_fig)
+        self.charge_fig, self.charge_canvas = create_figure()
         charge_container_layout.addWidget(self.charge_canvas)
         splitter.addWidget(charge_container)
        
@@ -1888,7 +1853,7 @@ class SimulationApp(QMainWindow):
     def draw_carrousel_animation(self, frame):
         self.carrousel_scene.clear()
         # Récupération des données
-        carrousel_num = self.carrousel_combo.currentIndex() + 1
+        carrousel_num = self.get_caroussel_combo(self.carrousel_combo)
         current_time = self.result_data['times'][frame]
         caroussel = f"caroussel_{carrousel_num}"
         num_bags = self.sim_data[caroussel]['Bagages_sur_tapis'][frame]
@@ -2107,7 +2072,7 @@ class SimulationApp(QMainWindow):
         self.charge_fig.clear()
         ax = self.charge_fig.add_subplot(111)
        
-        carrousel_num = self.carrousel_combo.currentIndex()+1
+        carrousel_num = self.get_caroussel_combo(self.carrousel_combo)
         carrousel_data = self.sim_data[f"caroussel_{carrousel_num}"]
        
         # Tracer l'historique de charge
@@ -2146,7 +2111,7 @@ class SimulationApp(QMainWindow):
         ax.set_xticklabels(simplified_times)
        
         # Rotation des étiquettes x pour plus de lisibilité
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        setp(ax.get_xticklabels(), rotation=45, ha='right')
        
         self.charge_fig.tight_layout()
         self.charge_canvas.draw()
@@ -2251,12 +2216,12 @@ class SimulationApp(QMainWindow):
          
         # Configurer des délégués pour la validation des données
         # Délégué pour la zone (A ou B)
-        zone_delegate = ZoneDelegate()
+        zone_delegate = ZoneDelegate(self.get_zones())
         table_view.setItemDelegateForColumn(1, zone_delegate)
         
          
         # Délégué pour le carrousel (dépend de la zone)
-        #carrousel_delegate = CarrouselDelegate()
+        #carrousel_delegate = CarrouselDelegate(self.get_zones())
         #table_view.setItemDelegateForColumn(2, carrousel_delegate)
         
         # Connecter le changement de zone pour mettre à jour les valeurs possibles du carrousel
@@ -2296,27 +2261,25 @@ class SimulationApp(QMainWindow):
             carrousel_item = self.compagnies_model.item(row, 2)
             
             if zone_item and carrousel_item:
+                zones = {zone: [str(caroussel) for caroussel in caroussels] for zone, caroussels in self.get_zones().items()}
                 zone = zone_item.text().upper()
                 current_carrousel = carrousel_item.text()
                 
                 # Valider la zone
-                if zone not in ['A', 'B']:
-                    zone_item.setText('A')  # Valeur par défaut
-                    zone = 'A'
+                if zone not in zones:
+                    zone = next(iter(zones))  # Valeur par défaut
+                    zone_item.setText(zone)
                 
                 # Valider le carrousel en fonction de la zone
-                if zone == 'A':
-                    if current_carrousel not in ['1', '2']:
-                        carrousel_item.setText('1')
-                else:  # zone B
-                    if current_carrousel not in ['3', '4', '5']:
-                        carrousel_item.setText('3')
+                if current_carrousel not in zones[zone]:
+                    carrousel_item.setText(zones[zone][0])
 
     def add_compagnie(self):
         """Ajoute une nouvelle ligne pour une nouvelle compagnie"""
+        zone, caroussels = next(iter(self.get_zones().items()))
         compagnie_item = QStandardItem("Nouvelle compagnie")
-        zone_item = QStandardItem("A")
-        carrousel_item = QStandardItem("1")
+        zone_item = QStandardItem(zone)
+        carrousel_item = QStandardItem(str(caroussels[0]))
         
         compagnie_item.setEditable(True)
         zone_item.setEditable(True)
@@ -2341,6 +2304,7 @@ class SimulationApp(QMainWindow):
         """Enregistre les modifications dans la base de données"""
         # Récupérer toutes les données du modèle
         compagnies = []
+        zones = {zone: [str(caroussel) for caroussel in caroussels] for zone, caroussels in self.get_zones().items()}
         for row in range(self.compagnies_model.rowCount()):
             compagnie = self.compagnies_model.item(row, 0).text()
             zone = self.compagnies_model.item(row, 1).text().upper()
@@ -2351,16 +2315,12 @@ class SimulationApp(QMainWindow):
                 QMessageBox.warning(window, "Erreur", f"Le nom de la compagnie ne peut pas être vide (ligne {row+1})")
                 return
             
-            if zone not in ['A', 'B']:
-                QMessageBox.warning(window, "Erreur", f"La zone doit être 'A' ou 'B' (ligne {row+1})")
+            if zone not in zones:
+                QMessageBox.warning(window, "Erreur", f"La zone doit être {', '.join(zones)} (ligne {row+1})")
                 return
             
-            if zone == 'A' and carrousel not in ['1', '2']:
-                QMessageBox.warning(window, "Erreur", f"Pour la zone A, le carrousel doit être 1 ou 2 (ligne {row+1})")
-                return
-            
-            if zone == 'B' and carrousel not in ['3', '4', '5']:
-                QMessageBox.warning(window, "Erreur", f"Pour la zone B, le carrousel doit être 3, 4 ou 5 (ligne {row+1})")
+            if carrousel not in zones[zone]:
+                QMessageBox.warning(window, "Erreur", f"Pour la zone {zone}, le carrousel doit être {', '.join(zones[zone])} (ligne {row+1})")
                 return
             
             compagnies.append((compagnie, zone, int(carrousel)))
@@ -2368,6 +2328,7 @@ class SimulationApp(QMainWindow):
         # Mettre à jour la base de données
         try:
             self.db.update_compagnies(compagnies)
+            self.charger_topologie()
             QMessageBox.information(window, "Succès", "Les modifications ont été enregistrées")
             window.close()
         except Exception as e:
@@ -2439,6 +2400,21 @@ class SimulationApp(QMainWindow):
         self.mut_spin.setValue(0.15)
         mut_layout.addWidget(self.mut_spin)
         params_layout.addLayout(mut_layout)
+
+        # Nombre de processus de calcul
+        workers_layout = QHBoxLayout()
+        workers_Label_param=QLabel("Processus de calcul:")
+        workers_Label_param.setAlignment(Qt.AlignRight|Qt.AlignVCenter)
+        workers_layout.addWidget(workers_Label_param)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setValue(1)
+        self.workers_spin.setToolTip("1 processus : chaque enfant est évalué par delta à partir de son parent "
+                                     "(seuls les carrousels modifiés sont resimulés).\n"
+                                     "Plusieurs processus : chaque enfant est simulé en entier, "
+                                     "le gain n'apparaît qu'avec de grandes populations.")
+        workers_layout.addWidget(self.workers_spin)
+        params_layout.addLayout(workers_layout)
         
 
         
@@ -2482,7 +2458,7 @@ class SimulationApp(QMainWindow):
         carrousel_control = QHBoxLayout()
         carrousel_control.addWidget(QLabel("Carrousel à visualiser:"))
         self.carrousel_combo = QComboBox()
-        self.carrousel_combo.addItems(["Zone A-1", "Zone A-2", "Zone B-1", "Zone B-2", "Zone B-3"])
+        self.add_caroussels_combo(self.carrousel_combo)
         carrousel_control.addWidget(self.carrousel_combo)
         self.optimization_export_button = QPushButton(self.icons['export'], "Exporter CSV")
         self.optimization_export_button.clicked.connect(self.optimization_export)
@@ -2490,8 +2466,7 @@ class SimulationApp(QMainWindow):
         graph_layout.addLayout(carrousel_control)
         
         # Graphique de comparaison
-        self.comparison_fig = Figure(figsize=(10, 6))
-        self.comparison_canvas = FigureCanvas(self.comparison_fig)
+        self.comparison_fig, self.comparison_canvas = create_figure(figsize=(10, 6))
         graph_layout.addWidget(self.comparison_canvas)
         
         splitter.addWidget(graph_container)
@@ -2520,7 +2495,7 @@ class SimulationApp(QMainWindow):
         if not hasattr(self, 'initial_data') or not hasattr(self, 'optimized_data'):
             return
         
-        carrousel_num = self.carrousel_combo.currentIndex() + 1
+        carrousel_num = self.get_caroussel_combo(self.carrousel_combo)
         carrousel_key = f"caroussel_{carrousel_num}"
         
         # Vérifier que les données existent
@@ -2573,7 +2548,7 @@ class SimulationApp(QMainWindow):
         ax.set_xticklabels(simplified_times)
         
         # Rotation des étiquettes x pour plus de lisibilité
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        setp(ax.get_xticklabels(), rotation=45, ha='right')
         
         self.comparison_fig.tight_layout()
         self.comparison_canvas.draw()
@@ -2583,7 +2558,6 @@ class SimulationApp(QMainWindow):
         # Récupérer les paramètres
         self.opt_type = self.param_combo.currentText()
         optim_compagnies = self.opt_type == "Compagnies"
-        max_carrousel = 5
         population_size = self.pop_size_spin.value()
         generations = self.gen_spin.value()
         mutation_rate = self.mut_spin.value()
@@ -2596,7 +2570,6 @@ class SimulationApp(QMainWindow):
         self.opt_thread = OptimizationThread(
                                                 self,
                                                 optim_compagnies,
-                                                max_carrousel,
                                                 population_size,
                                                 generations,
                                                 mutation_rate
@@ -2634,10 +2607,10 @@ class SimulationApp(QMainWindow):
     def start_optimisation(self):
         # Récupérer les paramètres
         optim_compagnies = self.opt_type == "Compagnies"
-        max_carrousel = 5
         population_size = self.pop_size_spin.value()
         generations = self.gen_spin.value()
         mutation_rate = self.mut_spin.value()
+        workers = self.workers_spin.value()
        
         # Désactiver le bouton de démarrage
         self.start_button.setEnabled(False)
@@ -2647,11 +2620,10 @@ class SimulationApp(QMainWindow):
         self.opt_thread = OptimizationThread(
             self,
             optim_compagnies,
-            max_carrousel,
             population_size,
             generations,
-            mutation_rate
-           
+            mutation_rate,
+            workers
         )
        
         self.opt_thread.progress_updated.connect(self.update_progress)
@@ -2711,7 +2683,7 @@ class SimulationApp(QMainWindow):
                                 ])
                 
                 # Écrire les données pour chaque carrousel
-                for carrousel_num in range(1, 6):
+                for carrousel_num, _, _ in self.get_caroussels():
                     writer.writerow([f"Carrousel {carrousel_num}"])
                     
                     initial_key = f"caroussel_{carrousel_num}"
@@ -2888,7 +2860,7 @@ class SimulationApp(QMainWindow):
         val_var_combo_label.setAlignment(Qt.AlignRight|Qt.AlignVCenter)
         carrousel_layout.addWidget(val_var_combo_label)
         self.carrousel_var_combo = QComboBox()
-        self.carrousel_var_combo.addItems(["All","Zone A-1", "Zone A-2", "Zone B-1", "Zone B-2", "Zone B-3"])
+        self.add_caroussels_combo(self.carrousel_var_combo, ["All"])
         carrousel_layout.addWidget(self.carrousel_var_combo)
 
         self.variation_export_button = QPushButton(self.icons['export'], "Exporter CSV")
@@ -2897,8 +2869,7 @@ class SimulationApp(QMainWindow):
         graph_layout.addLayout(carrousel_layout)
        
         # Graphique de variation
-        self.var_fig = Figure(figsize=(10, 6))
-        self.var_canvas = FigureCanvas(self.var_fig)
+        self.var_fig, self.var_canvas = create_figure(figsize=(10, 6))
         graph_layout.addWidget(self.var_canvas)
         
         splitter.addWidget(graph_container)
@@ -3000,7 +2971,7 @@ class SimulationApp(QMainWindow):
         if carrousel_num==0:
             titre=f"Tous les Carrousels"
         else:
-            titre=f"Carrousel analysé: {carrousel_num}"
+            titre=f"Carrousel analysé: {self.get_caroussel_combo(self.carrousel_var_combo)}"
         failures=[failure[carrousel_num] for failure in self.variation_failures]
 
         # Afficher le graphique
@@ -3062,13 +3033,8 @@ class SimulationApp(QMainWindow):
                 # Écrire l'en-tête
                 writer.writerow([
                                     'Valeur paramètre',
-                                    'Total échecs',
-                                    'Carrousel 1 échecs',
-                                    'Carrousel 2 échecs',
-                                    'Carrousel 3 échecs', 
-                                    'Carrousel 4 échecs',
-                                    'Carrousel 5 échecs'
-                                ])
+                                    'Total échecs'
+                                ] + [f'Carrousel {caroussel} échecs' for caroussel, _, _ in self.get_caroussels()])
                 
                 # Écrire les données
                 for i in range(len(self.variation_values)):
@@ -3197,7 +3163,7 @@ class SimulationApp(QMainWindow):
         label_type.setAlignment(Qt.AlignRight|Qt.AlignVCenter)
         graph_control.addWidget(label_type)
         self.period_data_combo = QComboBox()
-        self.period_data_combo.addItems(["Bagages", "Vols", "Voyageurs","All Carrousels","Carrousel-Zone A-1", "Carrousel-Zone A-2", "Carrousel-Zone B-1", "Carrousel-Zone B-2", "Carrousel-Zone B-3"])
+        self.add_caroussels_combo(self.period_data_combo, ["Bagages", "Vols", "Voyageurs","All Carrousels"], "Carrousel-")
         graph_control.addWidget(self.period_data_combo)
         self.period_export_button = QPushButton(self.icons['export'], "Exporter CSV")
         self.period_export_button.clicked.connect(self.start_simulation_periode_export)
@@ -3209,8 +3175,7 @@ class SimulationApp(QMainWindow):
 
         
         # Graphique
-        self.period_fig = Figure(figsize=(10, 6))
-        self.period_canvas = FigureCanvas(self.period_fig)
+        self.period_fig, self.period_canvas = create_figure(figsize=(10, 6))
         graph_layout.addWidget(self.period_canvas)
         
         splitter.addWidget(graph_container)
@@ -3359,8 +3324,8 @@ class SimulationApp(QMainWindow):
             elif data_typeIdx == 3:
                 data = results["nombre_echec"]
             else:  # Carrousel
-                carrousel_num = data_typeIdx-3
-                data = results[f"{carrousel_num}"]
+                carrousel_num = self.get_caroussel_combo(self.period_data_combo)
+                data = results.get(f"{carrousel_num}", 0)
             values.append(data)
         
         # Tracer le graphique
@@ -3371,7 +3336,7 @@ class SimulationApp(QMainWindow):
         ax.grid(True, linestyle='--', alpha=0.7)
         
         # Rotation des dates pour meilleure lisibilité
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        setp(ax.get_xticklabels(), rotation=45, ha='right')
         
         self.period_fig.tight_layout()
         self.period_canvas.draw()
@@ -3405,13 +3370,8 @@ class SimulationApp(QMainWindow):
                                     'Nombre de bagages',
                                     'Nombre de vols',
                                     'Nombre de voyageurs',
-                                    'Nombre total d\'échecs',
-                                    'Échecs Carrousel 1',
-                                    'Échecs Carrousel 2',
-                                    'Échecs Carrousel 3',
-                                    'Échecs Carrousel 4',
-                                    'Échecs Carrousel 5'
-                                ])
+                                    'Nombre total d\'échecs'
+                                ] + [f'Échecs Carrousel {caroussel}' for caroussel, _, _ in self.get_caroussels()])
                 
                 # Écrire les données pour chaque date
                 for date, results in sorted(self.period_results.items()):
@@ -3420,13 +3380,8 @@ class SimulationApp(QMainWindow):
                                         results['bagages'],
                                         results['vols'],
                                         results['voyageurs'],
-                                        results['nombre_echec'],
-                                        results['1'],  # Échecs Carrousel 1
-                                        results['2'],  # Échecs Carrousel 2
-                                        results['3'],  # Échecs Carrousel 3
-                                        results['4'],  # Échecs Carrousel 4
-                                        results['5']   # Échecs Carrousel 5
-                                    ])
+                                        results['nombre_echec']
+                                    ] + [results.get(f"{caroussel}", 0) for caroussel, _, _ in self.get_caroussels()])
                 
                 # Ajouter des métadonnées
                 writer.writerow([])
@@ -3465,6 +3420,11 @@ class SimulationApp(QMainWindow):
                                   ])
         self.param_combo.currentTextChanged.connect(self.parametres_optimise_traitement)
         param_layout.addWidget(self.param_combo)
+
+        # Carrousel dont la capacité varie ("Tous" = paramètre global de tous les carrousels)
+        self.carrousel_capacite_combo = QComboBox()
+        self.add_caroussels_combo(self.carrousel_capacite_combo, ["Tous"])
+        param_layout.addWidget(self.carrousel_capacite_combo)
         param_group.setLayout(param_layout)
         layout.addWidget(param_group)
 
@@ -3526,7 +3486,7 @@ class SimulationApp(QMainWindow):
         carrousel_layout = QHBoxLayout()
         
         self.carrousel_combo = QComboBox()
-        self.carrousel_combo.addItems(["Tous", "Zone A-1", "Zone A-2", "Zone B-1", "Zone B-2", "Zone B-3"])
+        self.add_caroussels_combo(self.carrousel_combo, ["Tous"])
         self.carrousel_combo.currentTextChanged.connect(self.draw_optimise_traitement)
         carrousel_layout.addWidget(self.carrousel_combo)
         self.optimise_traitement_button = QPushButton(self.icons['export'], "Exporter CSV")
@@ -3543,8 +3503,7 @@ class SimulationApp(QMainWindow):
         layout.addWidget(self.results_table)
 
         # 6. Graphique
-        self.plot_fig = Figure()
-        self.plot_canvas = FigureCanvas(self.plot_fig)
+        self.plot_fig, self.plot_canvas = create_figure()
         layout.addWidget(self.plot_canvas)
         self.parametres_optimise_traitement()
         self.opt_traitement_window.show()
@@ -3600,6 +3559,10 @@ class SimulationApp(QMainWindow):
         """Lance l'optimisation sur le paramètre sélectionné."""
         param_idx = self.param_combo.currentIndex()
         param_name = ["traitement", "poids_max", "longueur_max"][param_idx]
+        if self.carrousel_capacite_combo.currentIndex() == 0:
+            caroussel = None
+        else:
+            caroussel = self.get_caroussel_combo(self.carrousel_capacite_combo)
         
         # Configurer le thread d'optimisation
         self.opt_thread = SingleParamOptimisationThread(
@@ -3607,7 +3570,8 @@ class SimulationApp(QMainWindow):
                                                             param_name=param_name,
                                                             min_val=self.min_spin.value(),
                                                             max_val=self.max_spin.value(),
-                                                            step=self.step_spin.value()
+                                                            step=self.step_spin.value(),
+                                                            caroussel=caroussel
         )
         
         self.opt_thread.finished.connect(self.period_optimisation_finished)
@@ -3660,39 +3624,17 @@ class SimulationApp(QMainWindow):
                 writer = csv.writer(csvfile, delimiter=';')
                 
                 # Écrire l'en-tête
-                writer.writerow([
-                                    'Valeur paramètre',
-                                    'Échecs totaux',
-                                    'Échecs Zone A-1',
-                                    'Échecs Zone A-2',
-                                    'Échecs Zone B-1',
-                                    'Échecs Zone B-2',
-                                    'Échecs Zone B-3',
-                                    'Taux saturation total (%)',
-                                    'Taux saturation Zone A-1 (%)',
-                                    'Taux saturation Zone A-2 (%)',
-                                    'Taux saturation Zone B-1 (%)',
-                                    'Taux saturation Zone B-2 (%)',
-                                    'Taux saturation Zone B-3 (%)'
-                                ])
+                libelles = self.get_caroussels_libelles()
+                writer.writerow(['Valeur paramètre', 'Échecs totaux']
+                                + [f'Échecs {libelle}' for libelle in libelles]
+                                + ['Taux saturation total (%)']
+                                + [f'Taux saturation {libelle} (%)' for libelle in libelles])
                 
-                # Écrire les données pour chaque valeur testée
+                # Écrire les données pour chaque valeur testée (indice 0 = total, puis un par carrousel)
                 for param_value, (failures, saturations) in sorted(self.optimise_traitement_results.items()):
-                    writer.writerow([
-                                        param_value,
-                                        failures[0],  # Total
-                                        failures[1],  # Zone A-1
-                                        failures[2],  # Zone A-2
-                                        failures[3],  # Zone B-1
-                                        failures[4],  # Zone B-2
-                                        failures[5],  # Zone B-3
-                                        saturations[0],  # Total
-                                        saturations[1],  # Zone A-1
-                                        saturations[2],  # Zone A-2
-                                        saturations[3],  # Zone B-1
-                                        saturations[4],  # Zone B-2
-                                        saturations[5]   # Zone B-3
-                                    ])
+                    writer.writerow([param_value]
+                                    + [failures[j] for j in range(len(libelles) + 1)]
+                                    + [saturations[j] for j in range(len(libelles) + 1)])
                 
                 # Ajouter des métadonnées
                 writer.writerow([])
@@ -3724,14 +3666,14 @@ class OptimizationThread(QThread):
     progress_updated = pyqtSignal(int, str)
     results_ready = pyqtSignal(dict,dict, int, int,dict)
    
-    def __init__(self, app, optim_compagnies, max_carrousel, population_size, generations, mutation_rate):
+    def __init__(self, app, optim_compagnies, population_size, generations, mutation_rate, workers=1):
         super().__init__()
         self.app = app
         self.optim_compagnies = optim_compagnies
-        self.max_carrousel = max_carrousel
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
+        self.workers = workers
         self._is_running = True
    
     def run(self):
@@ -3746,14 +3688,14 @@ class OptimizationThread(QThread):
        
 
         # Créer l'optimiseur
-
+        from onda_optimise import OptimiseurGP
         optimiseur = OptimiseurGP(
                             sim,
-                            max_carrousel=self.max_carrousel,
                             optim_compagnies=self.optim_compagnies,
                             population_size=self.population_size,
                             generations=self.generations,
-                            mutation_rate=self.mutation_rate
+                            mutation_rate=self.mutation_rate,
+                            workers=self.workers
                                 )
 
         # Connecter le signal de progression
@@ -3815,12 +3757,12 @@ class VariationThread(QThread):
             self.progress_updated.emit(progress, f"Simulation avec {self.param} = {val:.2f}")
             
             # Créer une nouvelle simulation avec le paramètre modifié
-            result, data, sim = self.run_simulation_with_param(val)
+            result, data, sim = self.run_simulation_with_param(val, current_step)
 
             # Calculer le temps total de saturation (en minutes)
-            failure=[data["nombre_echec"],0,0,0,0,0]
-            for i in range(1, 6):
-                failure[i] = data[f"caroussel_{i}"]["nombre_echec"] 
+            failure=[data["nombre_echec"]]
+            for i, _, _ in self.app.get_caroussels():
+                failure.append(data[f"caroussel_{i}"]["nombre_echec"])
             # Stocker les résultats
             param_values.append(val)
             failures.append(failure)
@@ -3832,8 +3774,13 @@ class VariationThread(QThread):
         if self._is_running:
             self.results_ready.emit(param_values, failures)
     
-    def run_simulation_with_param(self, param_value):
-        """Exécute une simulation avec la valeur du paramètre spécifiée"""
+    def run_simulation_with_param(self, param_value, candidat=0):
+        """
+        Exécute une simulation avec la valeur du paramètre spécifiée
+        (mêmes nombres aléatoires pour tous les candidats si params.crn)
+        """
+        from onda_simulation import (Simulate_normale, Simulate_poisson, Simulate_beta,
+                                     Simulate_binomialnegatif, Simulate_bimodal)
         self.app.update_params()
 
         if self.sim_type == "normal" and "Écart-type" in self.param:
@@ -3898,7 +3845,7 @@ class VariationThread(QThread):
                 )
 
         
-        result = sim.run()
+        result = sim.run(sim.seed_sequence(candidat))
         data = sim.simulate(result)
         return result, data, sim
     
@@ -3922,37 +3869,41 @@ class PeriodSimulationThread(QThread):
         self._is_running = True
     
     def run(self):
+        dates = []
         current_date = self.start_date
-        total_days = self.start_date.daysTo(self.end_date) + 1
-        current_day = 0
-        daily_results={}
-        while current_date <= self.end_date and self._is_running:
-            date_str = current_date.toString("yyyy-MM-dd")
-            self.progress_updated.emit(int((current_day / total_days) * 100),f"Simulation pour {date_str}...")
-            
-            # Configurer les paramètres pour cette date
-            self.params.date_str = date_str
-            
-            # Exécuter la simulation
-            result, data, sim = self.app.calcul_simulation(self.sim_type,self.params)
-         
-            # Préparer les résultats pour cette journée
-            daily_result = {
-                "bagages": sum([sum([bag[1] for bag in bagage])   for bagage in result["bagages"]]),
-                "vols": sum(len(vol)  for vol in result["vols"]),
-                "voyageurs": sum(len(voyageur)  for voyageur in result["voyageurs"]),
-                "nombre_echec": data["nombre_echec"]
-            }
-
-            # Ajouter les données des carrousels
-            for i in range(1, 6):
-                daily_result[f"{i}"] = data[f"caroussel_{i}"]["nombre_echec"]
-
+        while current_date <= self.end_date:
+            dates.append(current_date.toString("yyyy-MM-dd"))
             current_date = current_date.addDays(1)
-            current_day += 1
-            daily_results[date_str]=daily_result
+
+        # Charger en une seule fois les vols de la période et les affectations des compagnies
+        self.progress_updated.emit(0, "Chargement des vols de la période...")
+        db = DBaircraft(self.params.db_path, cache=self.params.db_cache)
+        flights_by_date = db.get_flights_range(self.params.site,
+                                               self.start_date.toString("yyyy-MM-dd"),
+                                               self.end_date.toString("yyyy-MM-dd"),
+                                               self.params.compagnies,
+                                               self.params.num_vols)
+        compagnies_info = db.get_compagnies_info()
+
+        # Les journées sont indépendantes : elles sont réparties sur les processus de calcul
+        from onda_periode import simulate_period
+        daily_results = simulate_period(
+                                        self.sim_type,
+                                        self.app.get_simulation_kwargs(self.sim_type, self.params),
+                                        self.params,
+                                        flights_by_date,
+                                        dates,
+                                        workers=self.params.period_workers,
+                                        chunksize=self.params.period_chunksize,
+                                        progress=self.handle_progress_update,
+                                        is_running=lambda: self._is_running,
+                                        compagnies_info=compagnies_info
+                                        )
         # Émettre les résultats
         self.results_ready.emit( daily_results)
+
+    def handle_progress_update(self, termines, total, date_str):
+        self.progress_updated.emit(int((termines / total) * 100), f"Simulation du {date_str} terminée")
     
     def terminate(self):
         self._is_running = False
@@ -3960,9 +3911,13 @@ class PeriodSimulationThread(QThread):
 #-----------------------------------------------------------------------------------
 # Classes déléguées pour la validation des données
 class ZoneDelegate(QStyledItemDelegate):
+    def __init__(self, zones, parent=None):
+        super().__init__(parent)
+        self.zones = zones
+
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
-        editor.addItems(['A', 'B'])
+        editor.addItems(list(self.zones))
         return editor
     
     def setEditorData(self, editor, index):
@@ -3973,6 +3928,10 @@ class ZoneDelegate(QStyledItemDelegate):
         model.setData(index, editor.currentText(), Qt.EditRole)
 
 class CarrouselDelegate(QStyledItemDelegate):
+    def __init__(self, zones, parent=None):
+        super().__init__(parent)
+        self.zones = zones
+
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
         
@@ -3980,10 +3939,7 @@ class CarrouselDelegate(QStyledItemDelegate):
         zone_index = index.model().index(index.row(), 1)
         zone = index.model().data(zone_index, Qt.DisplayRole)
         
-        if zone == 'A':
-            editor.addItems(['1', '2'])
-        else:
-            editor.addItems(['3', '4', '5'])
+        editor.addItems([str(caroussel) for caroussel in self.zones.get(zone, [])])
         
         return editor
     
@@ -3998,12 +3954,18 @@ class SingleParamOptimisationThread(QThread):
     progress_updated = pyqtSignal(int, str)
     results_ready = pyqtSignal(dict)
 
-    def __init__(self, app, param_name, min_val, max_val, step):
+    # Clés de carousels.capacity des paramètres de traitement
+    CAPACITES = {"traitement": "processing_rate", "poids_max": "max_weight", "longueur_max": "max_length"}
+
+    def __init__(self, app, param_name, min_val, max_val, step, caroussel=None):
+        """caroussel : seul carrousel dont la capacité varie (None = paramètre global)"""
         super().__init__()
         self.app = app
         self.sim_type=self.app.get_curent_simulation()
         self.params = deepcopy(app.params)
         self.param_name = param_name  # "traitement"|"poids_max"|"longueur_max"
+        self.caroussel = caroussel
+        self.caroussels = app.get_caroussels()
         self.min_val = min_val
         self.max_val = max_val
         self.step = step
@@ -4019,21 +3981,27 @@ class SingleParamOptimisationThread(QThread):
                 break
                 
             # Mettre à jour le paramètre
-            setattr(self.params, self.param_name, int(current_val))
-            
-            result, data, sim = self.app.calcul_simulation(self.sim_type,self.params)
+            if self.caroussel is None:
+                setattr(self.params, self.param_name, int(current_val))
+                result, data, sim = self.app.calcul_simulation(self.sim_type,self.params)
+            elif i == 0:
+                self.params.set_capacite(self.caroussel, **{self.CAPACITES[self.param_name]: int(current_val)})
+                result, data, sim = self.app.calcul_simulation(self.sim_type,self.params)
+            else:
+                # Seul le carrousel dimensionné est re-simulé, les autres gardent le résultat précédent
+                data = sim.simulate_capacite(result, data, self.caroussel, **{self.CAPACITES[self.param_name]: int(current_val)})
             len_data_times=len(result["times"])
 
             daily_echec={}
             daily_echec[0]=data["nombre_echec"]
-            # Ajouter les données des carrousels
-            for j in range(1, 6):
-                daily_echec[j] = sum([x for x in data[f"caroussel_{j}"]["Echec"]])
+            # Ajouter les données des carrousels (indice j = rang dans app.get_caroussels())
+            for j, (caroussel, _, _) in enumerate(self.caroussels, 1):
+                daily_echec[j] = sum([x for x in data[f"caroussel_{caroussel}"]["Echec"]])
             
             daily_saturation={}
             saturation = (data["nombre_echec"] / len_data_times) * 20
             daily_saturation[0]= saturation
-            for j in range(1, 6):
+            for j in range(1, len(self.caroussels) + 1):
                 daily_saturation[j] = (daily_echec[j] / len_data_times) * 100
 
 
@@ -4043,7 +4011,7 @@ class SingleParamOptimisationThread(QThread):
             progress = int(i  * (100/step_count))
             self.progress_updated.emit(
                                         progress,
-                                        f"{self.param_name}={current_val:.2f} → {saturation:.1f}% saturation"
+                                        f"{self.param_name}{'' if self.caroussel is None else f' (carrousel {self.caroussel})'}={current_val:.2f} → {saturation:.1f}% saturation"
                                     )
             
             current_val += self.step
@@ -0,0 +1,231 @@
+"""
+Mesure des performances des chemins critiques sur une base SQLite synthétique :
+Simulate.run / Simulate.simulate pour chaque distribution, une optimisation génétique
+à budget fixe et une simulation sur une période.
+
+Le rapport JSON (temps, évaluations par seconde, pic mémoire) permet de comparer les versions.
+
+Exemple :
+    python onda_benchmark.py --flights 300 --pax 180 --days 30 --out benchmark.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from onda_config import Params
+from onda_db import DBaircraft
+from onda_simulation import SIMULATIONS, create_simulation, default_simulation_kwargs
+from onda_optimise import OptimiseurGP
+from onda_periode import simulate_period
+#-------------------------------------------------------------------------------------------------
+def create_database(db_path, site, start_date, days, flights_per_day, pax_per_flight, nb_compagnies=20, seed=1):
+    """
+    Crée une base aircraft/compagnies synthétique : flights_per_day départs par jour pendant days jours,
+    PAXpayants tiré entre la moitié et 1,5 fois pax_per_flight
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS aircraft")
+        cursor.execute("DROP TABLE IF EXISTS compagnies")
+        cursor.execute("""CREATE TABLE aircraft (Site TEXT, Sens TEXT, NumVol TEXT, Compagnie TEXT, TypeAvion TEXT,
+                          DateHeurePrevue DATETIME, PAXpayants INTEGER, CarVol TEXT)""")
+        cursor.execute("CREATE TABLE compagnies (compagnies TEXT, zone TEXT, caroussel INTEGER)")
+
+        compagnies = [f"C{i:02d}" for i in range(nb_compagnies)]
+        cursor.executemany("INSERT INTO compagnies VALUES (?, ?, ?)",
+                           [(compagnie, "A" if i % 2 else "B", i % 5 + 1) for i, compagnie in enumerate(compagnies)])
+
+        debut = datetime.strptime(start_date, "%Y-%m-%d")
+        vols = []
+        for jour in range(days):
+            date_jour = debut + timedelta(days=jour)
+            for numero in range(flights_per_day):
+                heure = date_jour + timedelta(minutes=rng.randint(4 * 60, 23 * 60 + 59))
+                compagnie = rng.choice(compagnies)
+                pax = rng.randint(max(2, pax_per_flight // 2), max(2, pax_per_flight * 3 // 2))
+                vols.append((site, "D", f"{compagnie}{numero:04d}", compagnie, "A320",
+                             heure.strftime("%Y-%m-%d %H:%M"), pax, "C"))
+        cursor.executemany("INSERT INTO aircraft VALUES (?, ?, ?, ?, ?, ?, ?, ?)", vols)
+    conn.close()
+    DBaircraft(db_path).create_indexes(site, start_date)
+
+def mesurer(fonction, repetitions=1, memoire=True):
+    """
+    Exécute fonction repetitions fois : temps total, meilleur temps, et pic mémoire Python
+    (tracemalloc, mesuré sur une exécution supplémentaire pour ne pas fausser les temps)
+    """
+    temps = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        temps.append(time.perf_counter() - debut)
+    mesure = {
+        "repetitions": repetitions,
+        "temps_total_s": round(sum(temps), 6),
+        "temps_moyen_s": round(sum(temps) / repetitions, 6),
+        "meilleur_temps_s": round(min(temps), 6),
+    }
+    if memoire:
+        tracemalloc.start()
+        fonction()
+        mesure["pic_memoire_mo"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+        tracemalloc.stop()
+    return mesure
+#-------------------------------------------------------------------------------------------------
+def bench_distributions(params, types, repetitions, memoire):
+    """Simulate.run, Simulate.simulate et le moteur à événements (simulate_evenements) pour chaque distribution"""
+    resultats = {}
+    for sim_type in types:
+        sim = create_simulation(sim_type, params, **default_simulation_kwargs(sim_type, params))
+        result = sim.run()
+        run = mesurer(sim.run, repetitions, memoire)
+        simulate = mesurer(lambda: sim.simulate(result), repetitions, memoire)
+        evenements = mesurer(sim.simulate_evenements, repetitions, memoire)
+        run["evaluations_par_s"] = round(1 / run["temps_moyen_s"], 3)
+        simulate["evaluations_par_s"] = round(1 / simulate["temps_moyen_s"], 3)
+        evenements["evaluations_par_s"] = round(1 / evenements["temps_moyen_s"], 3)
+        resultats[sim_type] = {
+            "vols": int(result.nombres("vols").sum()),
+            "bagages": int(result.nombres("bagages").sum()),
+            "run": run,
+            "simulate": simulate,
+            "simulate_evenements": evenements,
+        }
+        print(f"{sim_type:16s} run {run['temps_moyen_s']:.4f} s   simulate {simulate['temps_moyen_s']:.4f} s"
+              f"   événements {evenements['temps_moyen_s']:.4f} s")
+    return resultats
+
+def bench_optimisation(params, sim_type, population, generations, workers, memoire):
+    """Optimisation génétique à budget fixe (population x générations)"""
+    sim = create_simulation(sim_type, params, **default_simulation_kwargs(sim_type, params))
+    optimiseurs = []
+
+    def optimiser():
+        optimiseur = OptimiseurGP(sim, population_size=population, generations=generations, workers=workers)
+        optimiseur.run()
+        optimiseurs.append(optimiseur)
+
+    mesure = mesurer(optimiser, 1, memoire and workers == 1)
+    optimiseur = optimiseurs[0]
+    evaluations = optimiseur.cache_hits + optimiseur.cache_misses
+    mesure.update({
+        "type": sim_type,
+        "population": population,
+        "generations": generations,
+        "workers": workers,
+        "evaluations": evaluations,
+        "evaluations_calculees": optimiseur.cache_misses,
+        "evaluations_par_s": round(evaluations / mesure["temps_moyen_s"], 3),
+        "evaluations_calculees_par_s": round(optimiseur.cache_misses / mesure["temps_moyen_s"], 3),
+    })
+    print(f"optimisation     {mesure['temps_moyen_s']:.2f} s   {mesure['evaluations_calculees_par_s']} évaluations/s")
+    return mesure
+
+def bench_periode(params, sim_type, start_date, days, workers, memoire):
+    """Simulation jour par jour sur days jours (lecture des vols comprise)"""
+    debut = datetime.strptime(start_date, "%Y-%m-%d")
+    dates = [(debut + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+    def simuler():
+        db = DBaircraft(params.db_path)
+        flights_by_date = db.get_flights_range(params.site, dates[0], dates[-1], params.compagnies, params.num_vols)
+        simulate_period(sim_type, default_simulation_kwargs(sim_type, params), params, flights_by_date, dates,
+                        workers=workers, chunksize=params.period_chunksize, compagnies_info=db.get_compagnies_info())
+
+    mesure = mesurer(simuler, 1, memoire and workers == 1)
+    mesure.update({
+        "type": sim_type,
+        "jours": days,
+        "workers": workers,
+        "evaluations_par_s": round(days / mesure["temps_moyen_s"], 3),
+    })
+    print(f"période          {mesure['temps_moyen_s']:.2f} s   {mesure['evaluations_par_s']} jours/s")
+    return mesure
+#-------------------------------------------------------------------------------------------------
+def run_benchmark(args):
+    params = Params(args.config)
+    params.site = args.site
+    params.date_str = args.start
+    params.compagnies = []
+    params.num_vols = []
+    params.db_cache = False
+
+    repertoire = None
+    if args.db:
+        params.db_path = args.db
+    else:
+        repertoire = tempfile.TemporaryDirectory()
+        params.db_path = os.path.join(repertoire.name, "benchmark.db")
+    if not args.db or not os.path.exists(args.db):
+        debut = time.perf_counter()
+        create_database(params.db_path, args.site, args.start, args.days, args.flights, args.pax, seed=args.seed)
+        print(f"Base synthétique créée en {time.perf_counter() - debut:.2f} s : {params.db_path}")
+
+    memoire = not args.no_memory
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plateforme": platform.platform(),
+            "cpu": os.cpu_count(),
+        },
+        "echelle": {
+            "vols_par_jour": args.flights,
+            "pax_par_vol": args.pax,
+            "jours": args.days,
+            "step_time": params.step_time,
+        },
+        "distributions": bench_distributions(params, args.types or list(SIMULATIONS), args.repetitions, memoire),
+    }
+    if args.generations > 0:
+        rapport["optimisation"] = bench_optimisation(params, args.type, args.population, args.generations,
+                                                     args.workers, memoire)
+    if args.days > 0:
+        rapport["periode"] = bench_periode(params, args.type, args.start, args.days, args.workers, memoire)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+        print(f"Rapport écrit dans {args.out}")
+    else:
+        json.dump(rapport, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    if repertoire is not None:
+        repertoire.cleanup()
+    return rapport
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark des simulations sur une base synthétique")
+    parser.add_argument("--config", default="config.json", help="fichier de configuration")
+    parser.add_argument("--db", help="base SQLite à utiliser (créée si elle n'existe pas), temporaire par défaut")
+    parser.add_argument("--site", default="BENCH")
+    parser.add_argument("--start", default="2025-01-01", help="premier jour de la base synthétique")
+    parser.add_argument("--days", type=int, default=30, help="jours de la base et de la simulation sur une période")
+    parser.add_argument("--flights", type=int, default=200, help="vols par jour")
+    parser.add_argument("--pax", type=int, default=150, help="passagers moyens par vol")
+    parser.add_argument("--seed", type=int, default=1, help="graine de la base synthétique")
+    parser.add_argument("--types", nargs="*", choices=sorted(SIMULATIONS), help="distributions mesurées (toutes par défaut)")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--type", default="uniform", choices=sorted(SIMULATIONS), help="distribution de l'optimisation et de la période")
+    parser.add_argument("--population", type=int, default=20)
+    parser.add_argument("--generations", type=int, default=5, help="0 = pas de mesure de l'optimisation")
+    parser.add_argument("--workers", type=int, default=1, help="processus de calcul de l'optimisation et de la période")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire (tracemalloc)")
+    parser.add_argument("--out", help="fichier JSON du rapport (sortie standard par défaut)")
+    return parser
+
+if __name__ == "__main__":
+    run_benchmark(build_parser().parse_args())
@@ -0,0 +1,260 @@
+"""
+Lancement des simulations en ligne de commande, sans interface graphique (serveurs de calcul, cron).
+
+Exemples :
+    python onda_cli.py simulate --type normal --date 2025-04-04 --out resultats
+    python onda_cli.py simulate --type normal --engine evenements --params step_time=1
+    python onda_cli.py optimise --type beta --generations 30 --workers 8
+    python onda_cli.py variation --type normal --param sigma_minutes --min 10 --max 40 --step 5
+    python onda_cli.py periode --type uniform --start 2025-04-01 --end 2025-06-30 --workers 0
+    python onda_cli.py replications --type normal --count 1000 --ci-width 2
+    python onda_cli.py index
+"""
+import argparse
+import ast
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from onda_config import Params
+#-------------------------------------------------------------------------------------------------
+def parse_kwargs(valeurs):
+    """Convertit une liste 'nom=valeur' en dictionnaire (valeurs Python : nombres, listes...)"""
+    kwargs = {}
+    for valeur in valeurs or []:
+        nom, _, texte = valeur.partition("=")
+        try:
+            kwargs[nom] = ast.literal_eval(texte)
+        except (ValueError, SyntaxError):
+            kwargs[nom] = texte
+    return kwargs
+
+def load_params(args):
+    """Charge config.json puis applique les options de la ligne de commande"""
+    params = Params(args.config)
+    if args.db:
+        params.db_path = args.db
+    if args.site:
+        params.site = args.site
+    if getattr(args, "date", None):
+        params.date_str = args.date
+    if args.seed is not None:
+        params.default_seed = args.seed
+    if args.compagnies:
+        params.compagnies = args.compagnies
+    if args.vols:
+        params.num_vols = args.vols
+    for nom, valeur in parse_kwargs(args.params).items():
+        setattr(params, nom, valeur)
+    return params
+
+def simulation_kwargs(args, params):
+    from onda_simulation import default_simulation_kwargs
+    kwargs = default_simulation_kwargs(args.type, params)
+    kwargs.update(parse_kwargs(args.dist))
+    return kwargs
+
+def to_json(valeur):
+    """Conversion des types NumPy pour json.dump"""
+    if hasattr(valeur, "item"):
+        return valeur.item()
+    if hasattr(valeur, "tolist"):
+        return valeur.tolist()
+    raise TypeError(f"Type non sérialisable : {type(valeur)}")
+
+def write_json(args, nom, contenu):
+    os.makedirs(args.out, exist_ok=True)
+    chemin = os.path.join(args.out, nom)
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(contenu, f, ensure_ascii=False, indent=2, default=to_json)
+    print(f"Résultats écrits dans {chemin}")
+
+def write_csv(args, nom, entete, lignes):
+    os.makedirs(args.out, exist_ok=True)
+    chemin = os.path.join(args.out, nom)
+    with open(chemin, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile, delimiter=";")
+        writer.writerow(entete)
+        writer.writerows(lignes)
+    print(f"Résultats écrits dans {chemin}")
+#-------------------------------------------------------------------------------------------------
+def cmd_simulate(args):
+    from onda_simulation import create_simulation
+    params = load_params(args)
+    sim = create_simulation(args.type, params, **simulation_kwargs(args, params))
+    if args.engine == "evenements":
+        result = None
+        data = sim.simulate_evenements()
+    else:
+        result = sim.run()
+        data = sim.simulate(result)
+    print(f"{sim.name} {params.site} {params.date_str} : {data['nombre_echec']} échecs")
+    write_json(args, f"simulation_{args.type}_{params.site}_{params.date_str}.json",
+               {"params": {"site": params.site, "date": params.date_str, "type": args.type, "engine": args.engine},
+                "run": result.to_dict() if result is not None else None, "simulate": data})
+
+def cmd_optimise(args):
+    from onda_simulation import create_simulation
+    from onda_optimise import OptimiseurGP
+    params = load_params(args)
+    sim = create_simulation(args.type, params, **simulation_kwargs(args, params))
+    initial_failures = sim.simulate(sim.run())["nombre_echec"]
+    optimiseur = OptimiseurGP(
+                            sim,
+                            optim_compagnies=args.mode == "compagnies",
+                            population_size=args.population,
+                            generations=args.generations,
+                            mutation_rate=args.mutation,
+                            workers=args.workers
+                            )
+    optimiseur.progress_updated.connect(lambda progress, message: print(f"[{progress:3d}%] {message}"))
+    best_assignment, optimized_failures, original_liste = optimiseur.run()
+    print(f"Échecs : {initial_failures} -> {optimized_failures}")
+    write_json(args, f"optimisation_{args.type}_{params.site}_{params.date_str}.json",
+               {"initial_failures": initial_failures,
+                "optimized_failures": optimized_failures,
+                "original": original_liste,
+                "best": best_assignment})
+
+def cmd_variation(args):
+    from onda_simulation import create_simulation
+    params = load_params(args)
+    kwargs = simulation_kwargs(args, params)
+    lignes = []
+    caroussels = []
+    val = args.min
+    while val <= args.max:
+        kwargs[args.param] = val
+        sim = create_simulation(args.type, params, **kwargs)
+        data = sim.simulate(sim.run(sim.seed_sequence(len(lignes))))
+        caroussels = sim.caroussels
+        failure = [data["nombre_echec"]] + [data[f"caroussel_{i}"]["nombre_echec"] for i in caroussels]
+        print(f"{args.param} = {val:.2f} : {failure[0]} échecs")
+        lignes.append([val] + failure)
+        val += args.step
+    write_csv(args, f"variation_{args.type}_{args.param}.csv",
+              ["Valeur paramètre", "Total échecs"] + [f"Carrousel {i} échecs" for i in caroussels],
+              lignes)
+
+def cmd_periode(args):
+    from onda_db import DBaircraft
+    from onda_periode import simulate_period
+    params = load_params(args)
+    debut = datetime.strptime(args.start, "%Y-%m-%d")
+    fin = datetime.strptime(args.end, "%Y-%m-%d")
+    dates = [(debut + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((fin - debut).days + 1)]
+
+    db = DBaircraft(params.db_path, cache=params.db_cache)
+    flights_by_date = db.get_flights_range(params.site, args.start, args.end, params.compagnies, params.num_vols)
+    daily_results = simulate_period(
+                                    args.type,
+                                    simulation_kwargs(args, params),
+                                    params,
+                                    flights_by_date,
+                                    dates,
+                                    workers=params.period_workers if args.workers is None else args.workers,
+                                    chunksize=params.period_chunksize if args.chunksize is None else args.chunksize,
+                                    progress=lambda termines, total, date_str: print(f"[{termines}/{total}] {date_str}"),
+                                    compagnies_info=db.get_compagnies_info()
+                                    )
+    write_json(args, f"periode_{args.type}_{params.site}_{args.start}_{args.end}.json", daily_results)
+
+def cmd_replications(args):
+    from onda_replications import simulate_replications
+    params = load_params(args)
+    resultats = simulate_replications(
+                                    args.type,
+                                    simulation_kwargs(args, params),
+                                    params,
+                                    replications=params.replications if args.count is None else args.count,
+                                    workers=params.replications_workers if args.workers is None else args.workers,
+                                    batch=params.replications_batch if args.batch is None else args.batch,
+                                    ci_width=params.replications_ci_width if args.ci_width is None else args.ci_width,
+                                    confidence=params.replications_confidence,
+                                    antithetic=params.antithetic or args.antithetic,
+                                    progress=lambda n, total, moyenne, demi_largeur:
+                                        print(f"[{n}/{total}] échecs = {moyenne:.2f} ± {demi_largeur:.2f}")
+                                    )
+    ic = resultats["nombre_echec"]
+    print(f"{resultats['replications']} réplications : {ic['moyenne']:.2f} échecs "
+          f"(IC {100 * resultats['confidence']:g}% [{ic['ic_bas']:.2f}, {ic['ic_haut']:.2f}])")
+    write_json(args, f"replications_{args.type}_{params.site}_{params.date_str}.json", resultats)
+
+def cmd_index(args):
+    from onda_db import DBaircraft
+    params = load_params(args)
+    DBaircraft(params.db_path).create_indexes(params.site, params.date_str)
+#-------------------------------------------------------------------------------------------------
+def build_parser():
+    from onda_simulation import SIMULATIONS
+    commun = argparse.ArgumentParser(add_help=False)
+    commun.add_argument("--config", default="config.json", help="fichier de configuration")
+    commun.add_argument("--db", help="base SQLite (remplace db_path)")
+    commun.add_argument("--site", help="site aéroportuaire")
+    commun.add_argument("--seed", type=int, help="graine aléatoire")
+    commun.add_argument("--compagnies", nargs="*", help="compagnies à simuler")
+    commun.add_argument("--vols", nargs="*", help="numéros de vol à simuler")
+    commun.add_argument("--params", nargs="*", metavar="NOM=VALEUR", help="paramètres Params (ex: step_time=5 traitement=3)")
+    commun.add_argument("--out", default="resultats", help="répertoire de sortie")
+
+    distribution = argparse.ArgumentParser(add_help=False)
+    distribution.add_argument("--type", default="uniform", choices=sorted(SIMULATIONS), help="distribution des arrivées")
+    distribution.add_argument("--dist", nargs="*", metavar="NOM=VALEUR", help="paramètres de la distribution (ex: sigma_minutes=25)")
+
+    parser = argparse.ArgumentParser(description="Simulation de flux de bagages sans interface graphique")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    simulate = commandes.add_parser("simulate", parents=[commun, distribution], help="simulation d'une journée")
+    simulate.add_argument("--date", help="date (YYYY-MM-DD)")
+    simulate.add_argument("--engine", default="intervalles", choices=["intervalles", "evenements"],
+                          help="moteur : intervalles de step_time minutes ou événements discrets à la minute près")
+    simulate.set_defaults(func=cmd_simulate)
+
+    optimise = commandes.add_parser("optimise", parents=[commun, distribution], help="optimisation génétique des affectations")
+    optimise.add_argument("--date", help="date (YYYY-MM-DD)")
+    optimise.add_argument("--mode", default="compagnies", choices=["compagnies", "vols"])
+    optimise.add_argument("--population", type=int, default=20)
+    optimise.add_argument("--generations", type=int, default=10)
+    optimise.add_argument("--mutation", type=float, default=0.15)
+    optimise.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    optimise.set_defaults(func=cmd_optimise)
+
+    variation = commandes.add_parser("variation", parents=[commun, distribution], help="variation d'un paramètre de distribution")
+    variation.add_argument("--date", help="date (YYYY-MM-DD)")
+    variation.add_argument("--param", required=True, help="paramètre de la distribution à faire varier")
+    variation.add_argument("--min", type=float, required=True)
+    variation.add_argument("--max", type=float, required=True)
+    variation.add_argument("--step", type=float, required=True)
+    variation.set_defaults(func=cmd_variation)
+
+    periode = commandes.add_parser("periode", parents=[commun, distribution], help="simulation jour par jour sur une période")
+    periode.add_argument("--start", required=True, help="premier jour (YYYY-MM-DD)")
+    periode.add_argument("--end", required=True, help="dernier jour (YYYY-MM-DD)")
+    periode.add_argument("--workers", type=int, help="processus de calcul (0 = un par cœur)")
+    periode.add_argument("--chunksize", type=int, help="jours par tâche")
+    periode.set_defaults(func=cmd_periode)
+
+    replications = commandes.add_parser("replications", parents=[commun, distribution], help="réplications Monte Carlo d'une journée")
+    replications.add_argument("--date", help="date (YYYY-MM-DD)")
+    replications.add_argument("--count", type=int, help="nombre maximal de réplications")
+    replications.add_argument("--workers", type=int, help="processus de calcul (0 = un par cœur)")
+    replications.add_argument("--batch", type=int, help="réplications par tâche")
+    replications.add_argument("--ci-width", type=float, help="largeur d'intervalle de confiance visée (0 = pas d'arrêt anticipé)")
+    replications.add_argument("--antithetic", action="store_true", help="réplications par paires antithétiques")
+    replications.set_defaults(func=cmd_replications)
+
+    index = commandes.add_parser("index", parents=[commun], help="création des index de la table aircraft")
+    index.add_argument("--date", help="date utilisée pour afficher les plans de requête")
+    index.set_defaults(func=cmd_index)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    debut = time.perf_counter()
+    args.func(args)
+    print(f"Terminé en {time.perf_counter() - debut:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ class Params:
         
         # Paramètres de base
         self.db_path = self.get_config("db_path", expected_type=str)
+        self.db_cache = self.get_config("db_cache", default=False, expected_type=bool)
         self.site = self.get_config("default_site", expected_type=str)
         self.date_str = self.get_config("default_date", expected_type=str)
         self.default_seed = self.get_config("default_seed", default=10, expected_type=int)
@@ -30,6 +31,32 @@ class Params:
         self.poids_max = self.get_config("conveyor.max_weight", default=1200, expected_type=int)
         self.longueur_max = self.get_config("conveyor.max_length", default=20, expected_type=int)
 
+        # Topologie des carrousels {zone: [carrousels]} (absente = lue dans la table compagnies)
+        # et capacités propres à certains carrousels {"14": {"max_weight", "max_length", "processing_rate"}},
+        # les autres carrousels utilisent les valeurs de conveyor
+        self.zones = self.get_config("carousels.zones", default=None, expected_type=dict)
+        self.capacites = self.get_config("carousels.capacity", default={}, expected_type=dict)
+
+        # Paramètres simulation sur une période (0 processus = un par cœur)
+        self.period_workers = self.get_config("period.workers", default=1, expected_type=int)
+        self.period_chunksize = self.get_config("period.chunksize", default=1, expected_type=int)
+
+        # Paramètres réplications Monte Carlo (ci_width 0 = pas d'arrêt anticipé)
+        self.replications = self.get_config("replications.count", default=100, expected_type=int)
+        self.replications_workers = self.get_config("replications.workers", default=1, expected_type=int)
+        self.replications_batch = self.get_config("replications.batch", default=20, expected_type=int)
+        self.replications_ci_width = self.get_config("replications.ci_width", default=0.0, expected_type=float)
+        self.replications_confidence = self.get_config("replications.confidence", default=0.95, expected_type=float)
+
+        # Réduction de variance : nombres aléatoires communs aux candidats d'un balayage,
+        # réplications par paires antithétiques
+        self.crn = self.get_config("variance_reduction.common_random_numbers", default=True, expected_type=bool)
+        self.antithetic = self.get_config("variance_reduction.antithetic", default=False, expected_type=bool)
+
+        # Instrumentation (temps par étape, fichiers cProfile dans pstats_dir si renseigné)
+        self.profil = self.get_config("profiling.enabled", default=False, expected_type=bool)
+        self.profil_pstats_dir = self.get_config("profiling.pstats_dir", default="", expected_type=str)
+
         # Paramètres distributions 
         self.default_sigma = self.get_config("distributions.normal.default_sigma", default=20, expected_type=int)
 
@@ -97,6 +124,43 @@ class Params:
         
         return value
 
+    def get_caroussels(self, caroussels_db=()):
+        """
+        Carrousels simulés, triés : ceux des zones de la configuration
+        et ceux de la table compagnies (caroussels_db, valeurs NULL ignorées)
+        """
+        caroussels = {int(caroussel) for caroussels in (self.zones or {}).values() for caroussel in caroussels}
+        return sorted(caroussels | {caroussel for caroussel in caroussels_db if caroussel is not None})
+
+    def fusionner_zones(self, zones_db):
+        """
+        Topologie {zone: [carrousels]} des carrousels de get_caroussels() : zones de la configuration
+        complétées par les carrousels de la table compagnies (zones_db) qui n'y sont pas déclarés
+        """
+        zones = {zone: [int(caroussel) for caroussel in caroussels] for zone, caroussels in (self.zones or {}).items()}
+        connus = {caroussel for caroussels in zones.values() for caroussel in caroussels}
+        for zone, caroussels in zones_db.items():
+            for caroussel in caroussels:
+                if caroussel is not None and int(caroussel) not in connus:
+                    zones.setdefault(zone, []).append(int(caroussel))
+                    connus.add(int(caroussel))
+        return zones
+
+    def capacite(self, caroussel):
+        """(poids_max, longueur_max, traitement) du carrousel"""
+        capacite = self.capacites.get(str(caroussel), {})
+        return (capacite.get("max_weight", self.poids_max),
+                capacite.get("max_length", self.longueur_max),
+                capacite.get("processing_rate", self.traitement))
+
+    def set_capacite(self, caroussel, **capacite):
+        """
+        Remplace une partie de la capacité d'un carrousel (max_weight, max_length, processing_rate),
+        sans modifier la configuration lue dans le fichier
+        """
+        self.capacites = dict(self.capacites)
+        self.capacites[str(caroussel)] = {**self.capacites.get(str(caroussel), {}), **capacite}
+
     def __repr__(self):
         params_list = []
         for attr, value in vars(self).items():
@@ -1,6 +1,7 @@
 
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import csv
 import random
 
@@ -32,23 +33,92 @@ class Flight:
         return "Flight(" + ", ".join(params_list) + ")"
 
 class DBaircraft:
-    def __init__(self,db_path):
+    # Connexions ouvertes (une par thread et par base) et caches de résultats (un par base),
+    # partagés par toutes les instances pour que chaque Simulate profite des requêtes déjà faites
+    connexions = threading.local()
+    caches = {}
+    caches_lock = threading.Lock()
+
+    def __init__(self,db_path,cache=False):
         self.db_path = db_path
+        self.cache = cache
+
+    def get_connection(self):
+        """
+        Retourne la connexion du thread courant, ouverte au premier appel puis réutilisée
+        (sqlite3 garde en cache les requêtes préparées de chaque connexion)
+        """
+        if not hasattr(self.connexions, "bases"):
+            self.connexions.bases = {}
+        conn = self.connexions.bases.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            self.connexions.bases[self.db_path] = conn
+        return conn
+
+    def close(self):
+        """Ferme la connexion du thread courant"""
+        bases = getattr(self.connexions, "bases", {})
+        conn = bases.pop(self.db_path, None)
+        if conn is not None:
+            conn.close()
+
+    def get_cache(self, key):
+        if not self.cache:
+            return None
+        with self.caches_lock:
+            return self.caches.get(self.db_path, {}).get(key)
+
+    def set_cache(self, key, value):
+        if self.cache:
+            with self.caches_lock:
+                self.caches.setdefault(self.db_path, {})[key] = value
+
+    def clear_cache(self):
+        """Vide le cache de résultats de la base"""
+        with self.caches_lock:
+            self.caches.pop(self.db_path, None)
 
     def get_flights(self, site, date_str, compagnies=None, num_vols=None):
         """
         Récupère tous les vols pour une date donnée en fonction du champ DateHeurePrevue.
         Accepte maintenant des listes pour compagnies et num_vols.
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        key = ("flights", site, date_str, self.cache_key(compagnies), self.cache_key(num_vols))
+        flights = self.get_cache(key)
+        if flights is not None:
+            return list(flights)
+
+        flights = list(self.select_flights(site, *self.date_range(date_str), compagnies, num_vols))
+        
+        self.set_cache(key, flights)
+        return list(flights)
+
+    def get_flights_range(self, site, start_date, end_date, compagnies=None, num_vols=None):
+        """
+        Récupère en une seule requête les vols du start_date au end_date inclus,
+        regroupés par date ('YYYY-MM-DD') dans l'ordre chronologique
+        """
+        flights_by_date = {}
+        for flight in self.select_flights(site, start_date, self.date_range(end_date)[1], compagnies, num_vols):
+            date_str = flight.scheduled_datetime.strftime('%Y-%m-%d')
+            flights_by_date.setdefault(date_str, []).append(flight)
+        return flights_by_date
+
+    def select_flights(self, site, start, end, compagnies=None, num_vols=None):
+        """
+        Parcourt les vols au départ (Sens D, CarVol C) avec start <= DateHeurePrevue < end,
+        ligne par ligne sans charger tout le résultat en mémoire
+        """
+        conn = self.get_connection()
         cursor = conn.cursor()
-        params = [site, date_str, 'D', 'C']
+        params = [site, start, end, 'D', 'C']
         
         # Requête de base
         query = """
         SELECT Site, Sens, NumVol, Compagnie, TypeAvion, DateHeurePrevue, PAXpayants FROM aircraft     
-        WHERE Site=? AND date(DateHeurePrevue) = ? AND Sens=? AND CarVol=?
+        WHERE Site=? AND DateHeurePrevue >= ? AND DateHeurePrevue < ? AND Sens=? AND CarVol=?
         """
         
         # Gestion des compagnies (peut être une liste ou None)
@@ -67,14 +137,13 @@ class DBaircraft:
             query += f" AND NumVol IN ({placeholders})"
             params.extend(num_vols)
         
-        query += " ORDER BY DateHeurePrevue"
+        # NumVol départage les vols de même heure : l'ordre (et donc les tirages par vol)
+        # ne dépend pas du plan choisi par SQLite, avec ou sans index
+        query += " ORDER BY DateHeurePrevue, NumVol"
         
         cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
-        
-        flights = []
-        for row in rows:
-            flight = Flight(
+        for row in cursor:
+            yield Flight(
                 site=row['Site'],
                 direction=row['Sens'],
                 flight_number=row['NumVol'],
@@ -83,17 +152,28 @@ class DBaircraft:
                 scheduled_datetime=datetime.strptime(row['DateHeurePrevue'], '%Y-%m-%d %H:%M') if row['DateHeurePrevue'] else None,
                 passenger_count=int(row['PAXpayants']),
             )
-            flights.append(flight)
-        
-        conn.close()
-        return flights
+
+    def date_range(self, date_str):
+        """
+        Bornes [jour, lendemain[ pour filtrer DateHeurePrevue ('YYYY-MM-DD HH:MM') sans date(),
+        ce qui permet à SQLite d'utiliser les index sur cette colonne
+        """
+        lendemain = datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)
+        return date_str, lendemain.strftime('%Y-%m-%d')
+
+    def cache_key(self, valeurs):
+        """clé de cache pour un filtre compagnies/vols (None, chaîne ou liste)"""
+        if not valeurs:
+            return ()
+        if isinstance(valeurs, str):
+            return (valeurs,)
+        return tuple(sorted(valeurs))
 
     def get_sites(self):
         """
         Récupère tous les sites 
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
 
@@ -109,38 +189,34 @@ class DBaircraft:
         for row in rows:
             sites.append(row['Site'])
         
-        conn.close()
         return sites
 
     def get_compagnies(self,site,date_str):
         """
         Récupère toutes les compagnies 
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
 
         query = """
         SELECT distinct Compagnie FROM aircraft 
-        WHERE Site=? AND date(DateHeurePrevue) = ? AND Sens=?  AND CarVol=? 
+        WHERE Site=? AND DateHeurePrevue >= ? AND DateHeurePrevue < ? AND Sens=?  AND CarVol=? 
         ORDER BY Compagnie
         """
         
-        cursor.execute(query, (site,date_str,'D','C'))
+        cursor.execute(query, (site,*self.date_range(date_str),'D','C'))
         rows = cursor.fetchall()
         
         compagnies = []
         for row in rows:
             compagnies.append(row['Compagnie'])
         
-        conn.close()
         return compagnies
 
     def get_compagnies_period(self, site, start_date, end_date):
         """Retourne les compagnies ayant des vols entre les deux dates"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         query = """
@@ -157,7 +233,6 @@ class DBaircraft:
         for row in rows:
             compagnies.append(row['Compagnie'])
         
-        conn.close()
         return compagnies
 
 
@@ -167,30 +242,27 @@ class DBaircraft:
         """
         Récupère toutes les compagnies 
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
 
         query = """
         SELECT DISTINCT NumVol FROM aircraft 
-        WHERE Site=? AND date(DateHeurePrevue) = ? AND Compagnie=? AND Sens=?  AND CarVol=?
+        WHERE Site=? AND DateHeurePrevue >= ? AND DateHeurePrevue < ? AND Compagnie=? AND Sens=?  AND CarVol=?
         """
         
-        cursor.execute(query, (site,date_str,compagnie,'D','C'))
+        cursor.execute(query, (site,*self.date_range(date_str),compagnie,'D','C'))
         rows = cursor.fetchall()
         
         vols = []
         for row in rows:
             vols.append(row['NumVol'])
         
-        conn.close()
         return vols
 
     def get_vols_period(self, site, start_date, end_date, compagnie):
         """Retourne les vols d'une compagnie entre les deux dates"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
 
@@ -207,15 +279,17 @@ class DBaircraft:
         for row in rows:
             vols.append(row['NumVol'])
         
-        conn.close()
         return vols
 
     def get_compagnies_info(self):
         """
         Récupère toutes les compagnies 
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        compagnies = self.get_cache(("compagnies_info",))
+        if compagnies is not None:
+            return dict(compagnies)
+
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         query = """
@@ -230,14 +304,13 @@ class DBaircraft:
         for row in rows:
             compagnies[row['compagnies']]=row['caroussel']
         
-        conn.close()
-        return compagnies
+        self.set_cache(("compagnies_info",), compagnies)
+        return dict(compagnies)
     def get_All_compagnies(self,site):
         """
         Récupère toutes les compagnies 
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
 
@@ -254,15 +327,13 @@ class DBaircraft:
         for row in rows:
             compagnies.append(row['Compagnie'])
         
-        conn.close()
         return compagnies
 
     def get_All_flights(self,site):
         """
         Récupère toutes les flights 
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        conn = self.get_connection()
         cursor = conn.cursor()
         
 
@@ -280,19 +351,86 @@ class DBaircraft:
         for row in rows:
             flights.append([row['NumVol'],row['compagnies'],row['zone'],row['caroussel']])
         
-        conn.close()
         return flights
 
+    def get_zones(self):
+        """
+        Topologie des carrousels lue dans la table compagnies : {zone: [carrousels]}
+        """
+        zones = self.get_cache(("zones",))
+        if zones is not None:
+            return {zone: list(caroussels) for zone, caroussels in zones.items()}
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT zone, caroussel FROM compagnies ORDER BY zone, caroussel")
+        zones = {}
+        for row in cursor.fetchall():
+            zones.setdefault(row['zone'], []).append(row['caroussel'])
+
+        self.set_cache(("zones",), zones)
+        return {zone: list(caroussels) for zone, caroussels in zones.items()}
+
     def get_compagnies_all(self):
         """Récupère toutes les compagnies avec leur zone et carrousel"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT compagnies, zone, caroussel FROM compagnies ORDER BY compagnies")
-            return cursor.fetchall()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT compagnies, zone, caroussel FROM compagnies ORDER BY compagnies")
+        return [tuple(row) for row in cursor.fetchall()]
+
+    # Index composites utilisés par les requêtes par site/date
+    INDEXES = {
+        "idx_aircraft_site_sens_carvol_date": "aircraft (Site, Sens, CarVol, DateHeurePrevue)",
+        "idx_aircraft_site_compagnie_date": "aircraft (Site, Compagnie, DateHeurePrevue)",
+    }
+
+    def query_plan(self, query, params):
+        """Retourne le plan d'exécution SQLite d'une requête"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return [row['detail'] for row in cursor.fetchall()]
+
+    def create_indexes(self, site="", date_str="2000-01-01"):
+        """
+        Crée les index composites manquants sur la table aircraft et affiche
+        les plans des requêtes par date avant et après leur création
+        """
+        start, end = self.date_range(date_str)
+        requetes = {
+            "get_flights": ("""SELECT NumVol FROM aircraft
+                            WHERE Site=? AND DateHeurePrevue >= ? AND DateHeurePrevue < ? AND Sens=? AND CarVol=?
+                            ORDER BY DateHeurePrevue, NumVol""",
+                            (site, start, end, 'D', 'C')),
+            "get_vols": ("""SELECT DISTINCT NumVol FROM aircraft
+                            WHERE Site=? AND DateHeurePrevue >= ? AND DateHeurePrevue < ? AND Compagnie=? AND Sens=? AND CarVol=?""",
+                            (site, start, end, '', 'D', 'C')),
+        }
+        plans_avant = {nom: self.query_plan(*requete) for nom, requete in requetes.items()}
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='aircraft'")
+        existants = {row['name'] for row in cursor.fetchall()}
+        crees = []
+        with conn:
+            for nom, definition in self.INDEXES.items():
+                if nom not in existants:
+                    cursor.execute(f"CREATE INDEX {nom} ON {definition}")
+                    crees.append(nom)
+            if crees:
+                cursor.execute("ANALYZE aircraft")
+
+        plans_apres = {nom: self.query_plan(*requete) for nom, requete in requetes.items()}
+        print("Index créés :", ", ".join(crees) if crees else "aucun")
+        for nom in requetes:
+            print(f"{nom} avant : {' | '.join(plans_avant[nom])}")
+            print(f"{nom} après : {' | '.join(plans_apres[nom])}")
+        return {"crees": crees, "plans_avant": plans_avant, "plans_apres": plans_apres}
 
     def update_compagnies(self, compagnies):
         """Met à jour la table des compagnies avec les nouvelles données"""
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self.get_connection()
+        with conn:
             cursor = conn.cursor()
             
             # Supprimer toutes les entrées existantes
@@ -303,8 +441,9 @@ class DBaircraft:
                 "INSERT INTO compagnies (compagnies, zone, caroussel) VALUES (?, ?, ?)",
                 compagnies
             )
-            
-            conn.commit()
+        
+        # Les affectations ont changé : invalider les résultats en cache
+        self.clear_cache()
 if __name__ == "__main__":
     db=DBaircraft("onda_aircraft.db")
     """
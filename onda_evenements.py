@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import math
+
+import numpy as np
+#-------------------------------------------------------------------------------------------------
+# Types d'événements, dans l'ordre de traitement à heure égale
+ARRIVEE = 0      # arrivée d'un voyageur à l'enregistrement
+INJECTION = 1    # dépôt de ses bagages sur le tapis du carrousel
+RETRAIT = 2      # prise d'un bagage par le manutentionnaire du vol
+FERMETURE = 3    # départ du vol : les bagages restants sur le tapis sont rejetés
+
+def simulate_evenements(ouverture, depart, caroussel_vol, debit, arrivees, flight_idx, nb_bagages, delai_injection=0.0):
+    """
+    Simulation à événements discrets des tapis, à la minute près (heures réelles, sans intervalles de temps).
+    ouverture, depart : heures (minutes) d'arrivée et de départ du manutentionnaire de chaque vol
+    caroussel_vol : indice du carrousel de chaque vol (-1 = carrousel non simulé)
+    debit : bagages retirés par minute par le manutentionnaire de chaque vol
+    arrivees, flight_idx, nb_bagages : heure d'arrivée, indice du vol et nombre de bagages de chaque voyageur
+    delai_injection : minutes entre l'arrivée d'un voyageur et le dépôt de ses bagages sur le tapis
+    Seuls les voyageurs avec bagages créent des événements et chaque bagage est retiré par un événement :
+    le coût est proportionnel au nombre de bagages, pas au nombre d'intervalles.
+    Retourne les journaux (heure, vol, variation du nombre de bagages sur le tapis) et (heure, vol, bagages rejetés).
+    """
+    # Listes Python : l'accès élément par élément est bien plus rapide que sur des tableaux NumPy
+    ouverture = np.asarray(ouverture, dtype=float).tolist()
+    depart = np.asarray(depart, dtype=float).tolist()
+    caroussel_vol = np.asarray(caroussel_vol, dtype=int).tolist()
+
+    sequence = itertools.count()
+    file = [(depart[vol], FERMETURE, next(sequence), vol, 0)
+            for vol in range(len(depart)) if caroussel_vol[vol] >= 0]
+    file.extend((heure, ARRIVEE, next(sequence), vol, nombre)
+                for heure, vol, nombre in zip(arrivees.tolist(), flight_idx.tolist(), nb_bagages.tolist())
+                if nombre > 0 and caroussel_vol[vol] >= 0)
+    heapq.heapify(file)
+
+    sur_tapis = [0] * len(depart)
+    occupe = [False] * len(depart)
+    libre = list(ouverture)
+    duree_retrait = [1 / d if d > 0 else math.inf for d in np.asarray(debit).tolist()]
+    mouvements = []
+    rejets = []
+    while file:
+        heure, evenement, _, vol, nombre = heapq.heappop(file)
+        if evenement == ARRIVEE:
+            if delai_injection > 0:
+                heapq.heappush(file, (heure + delai_injection, INJECTION, next(sequence), vol, nombre))
+                continue
+            evenement = INJECTION
+
+        if evenement == INJECTION:
+            # Pas de manutentionnaire pour le vol : les bagages sont rejetés
+            if heure < ouverture[vol] or heure >= depart[vol]:
+                rejets.append((heure, vol, nombre))
+                continue
+            sur_tapis[vol] += nombre
+            mouvements.append((heure, vol, nombre))
+            debut = max(heure, libre[vol])
+            if not occupe[vol] and debut < depart[vol]:
+                occupe[vol] = True
+                heapq.heappush(file, (debut, RETRAIT, next(sequence), vol, 0))
+
+        elif evenement == RETRAIT:
+            if sur_tapis[vol] == 0 or heure >= depart[vol]:
+                occupe[vol] = False
+                continue
+            sur_tapis[vol] -= 1
+            mouvements.append((heure, vol, -1))
+            libre[vol] = heure + duree_retrait[vol]
+            if sur_tapis[vol] > 0 and libre[vol] < depart[vol]:
+                heapq.heappush(file, (libre[vol], RETRAIT, next(sequence), vol, 0))
+            else:
+                occupe[vol] = False
+
+        elif sur_tapis[vol]:
+            # FERMETURE
+            mouvements.append((heure, vol, -sur_tapis[vol]))
+            rejets.append((heure, vol, sur_tapis[vol]))
+            sur_tapis[vol] = 0
+    return mouvements, rejets
+
+def resume_intervalles(mouvements, rejets, caroussel_vol, n_caroussels, start_min, step_time, n_slots):
+    """
+    Résumé par intervalle de temps des journaux de simulate_evenements() :
+    tableaux intervalles x carrousels des bagages sur les tapis en fin d'intervalle et des bagages rejetés
+    """
+    caroussel_vol = np.asarray(caroussel_vol, dtype=int)
+
+    def cumuler(journal, report):
+        tableau = np.zeros((n_slots, n_caroussels), dtype=int)
+        if not journal:
+            return tableau
+        heures, vols, nombres = (np.array(colonne) for colonne in zip(*journal))
+        slots = np.floor((heures - start_min) / step_time).astype(int)
+        if report:
+            # Les variations antérieures à la journée sont reportées sur le premier intervalle
+            slots = np.maximum(slots, 0)
+        valides = (slots >= 0) & (slots < n_slots)
+        np.add.at(tableau, (slots[valides], caroussel_vol[vols[valides]]), nombres[valides].astype(int))
+        return tableau
+
+    sur_tapis = np.cumsum(cumuler(mouvements, True), axis=0)
+    return sur_tapis, cumuler(rejets, False)
+#-------------------------------------------------------------------------------------------------
@@ -1,25 +1,94 @@
 import random
 import time
 import math
+import concurrent.futures
+import multiprocessing
+from collections import OrderedDict
 
 from copy import deepcopy
-from PyQt5.QtCore import QObject, pyqtSignal
 from onda_db import DBaircraft
 from onda_config import Params
 from onda_simulation import Simulate
+from onda_profil import Profil
 #------------------------------------------------------------------------------------------------- 
-class OptimiseurGP(QObject): 
-    progress_updated = pyqtSignal(int, str) 
-    def __init__(self, simulation: Simulate,max_carrousel=5,optim_compagnies=True, population_size=20, generations=50, mutation_rate=0.1,elite_size=5):
+def evaluer_affectation(simulation, demande, individual, optim_compagnies):
+    """
+    Affecte la demande (arrivées et bagages tirés une fois par Simulate.sample)
+    selon l'individu, simule les carrousels et retourne le nombre d'échecs
+    """
+    if optim_compagnies:
+        simulation.init_db_compagnies(individual)
+    else:
+        simulation.init_db_flights(individual)
+
+    data = simulation.assign(demande)
+    result = simulation.simulate(data)
+    return result["nombre_echec"]
+
+# Simulation et demande propres à chaque processus de calcul, chargées une seule fois au démarrage
+_worker_simulation = None
+_worker_demande = None
+_worker_optim_compagnies = True
+
+def _init_worker(simulation, demande, optim_compagnies):
+    global _worker_simulation, _worker_demande, _worker_optim_compagnies
+    _worker_simulation = simulation
+    # les mesures déjà présentes sont comptées dans le processus principal
+    _worker_simulation.profil.reset()
+    _worker_demande = demande
+    _worker_optim_compagnies = optim_compagnies
+
+def _evaluer_worker(individual):
+    nombre_echec = evaluer_affectation(_worker_simulation, _worker_demande, individual, _worker_optim_compagnies)
+    # Instrumentation active : renvoyer les mesures du processus pour les cumuler dans le processus principal
+    profil = _worker_simulation.profil
+    if profil.actif:
+        stats = profil.to_dict()
+        profil.reset()
+        return nombre_echec, stats
+    return nombre_echec
+#------------------------------------------------------------------------------------------------- 
+class Signal:
+    """
+    Signal minimal (connect/emit) : la progression est notifiée sans dépendre de Qt,
+    ce qui permet de lancer l'optimisation sans interface graphique
+    """
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+#------------------------------------------------------------------------------------------------- 
+class OptimiseurGP: 
+    def __init__(self, simulation: Simulate,caroussels=None,optim_compagnies=True, population_size=20, generations=50, mutation_rate=0.1,elite_size=5,workers=1,cache_size=4096):
         """
         Initialise l'algo génétique.
+        caroussels : carrousels proposés aux affectations (None = carrousels simulés, simulation.caroussels)
+        workers : nombre de processus pour évaluer les individus (1 = évaluation dans le processus courant)
+        cache_size : nombre maximal d'affectations dont la fitness est conservée (0 = pas de cache)
         """
-        super().__init__() 
+        self.progress_updated = Signal()
         self.simulation = simulation
+        self.profil = Profil(simulation.profil.actif, simulation.profil.pstats_dir)
+        self.workers = workers
+        self.executor = None
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.demande = None
+        # Résultats complets de simulate() des derniers individus évalués dans ce processus,
+        # et parent le plus proche de chaque enfant : références de l'évaluation par delta
+        self.resultats = OrderedDict()
+        self.references = {}
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
-        self.max_carrousel=max_carrousel
+        self.caroussels = list(simulation.caroussels if caroussels is None else caroussels)
         self.optim_compagnies=optim_compagnies
         self.elite_size=elite_size
         self.current_generation=0
@@ -35,7 +104,7 @@ class OptimiseurGP(QObject):
         
     def create_individual(self):
         """Crée un individu (affectation aléatoire des compagnies aux carrousels)"""
-        return {comp: random.randint(1, self.max_carrousel) for comp in self.simulate_list}
+        return {comp: random.choice(self.caroussels) for comp in self.simulate_list}
     
     def initialize_population(self) :
         """Initialise la population"""
@@ -43,22 +112,133 @@ class OptimiseurGP(QObject):
         population.append(deepcopy(self.original_liste))
         return population
     
-    def evaluate(self, individual) :
-        """Évalue un individu en lançant la simulation avec son affectation"""
- 
+    def get_demande(self):
+        """Tire une seule fois les arrivées et bagages, partagés par toutes les évaluations"""
+        if self.demande is None:
+            with self.profil.etape("get_demande"):
+                self.demande = self.simulation.sample()
+        return self.demande
+
+    def evaluate(self, individual, reference=None) :
+        """
+        Évalue un individu en simulant les carrousels avec son affectation.
+        Si le résultat de reference (individu proche, en général un parent) est connu,
+        seuls les carrousels touchés par les gènes modifiés sont re-simulés (evaluate_delta).
+        """
+        resultat_reference = None
+        if reference is not None:
+            resultat_reference = self.resultats.get(self.cache_key(reference))
+        if resultat_reference is not None:
+            resultat = self.evaluate_delta(individual, reference, resultat_reference)
+        else:
+            if self.optim_compagnies:
+                self.simulation.init_db_compagnies(individual)
+            else:
+                self.simulation.init_db_flights(individual)
+            resultat = self.simulation.simulate(self.simulation.assign(self.get_demande()))
+
+        # Seuls les résultats récents sont gardés (parents de la génération suivante)
+        self.resultats[self.cache_key(individual)] = resultat
+        while len(self.resultats) > 2 * self.population_size:
+            self.resultats.popitem(last=False)
+        return resultat["nombre_echec"]
+
+    def cache_key(self, individual):
+        """Clé canonique d'une affectation (indépendante de l'ordre des clés)"""
+        return tuple(sorted(individual.items()))
+
+    def evaluate_delta(self, individual, reference, reference_result):
+        """
+        Évalue un individu proche d'une référence déjà simulée (mutation, recherche locale) :
+        seuls les carrousels touchés par les gènes modifiés sont re-simulés.
+        Retourne le résultat complet, réutilisable comme référence.
+        """
+        caroussels = self.simulation.caroussels_modifies(reference, individual)
         if self.optim_compagnies:
-            self.simulation.init_db_compagnies( individual)
+            self.simulation.init_db_compagnies(individual)
         else:
-            self.simulation.init_db_flights( individual)
-        
-        data = self.simulation.run()
-        result = self.simulation.simulate(data)
-        random.seed(time.time())
-        return result["nombre_echec"]
+            self.simulation.init_db_flights(individual)
+        data = self.simulation.assign(self.get_demande())
+        return self.simulation.simulate_delta(data, reference_result, caroussels)
+
+    def evaluate_all(self, individuals):
+        """
+        Évalue une liste d'individus, en parallèle si un pool de processus est actif.
+        La simulation étant déterministe (graine fixe), la fitness d'une affectation déjà évaluée est lue dans le cache.
+        Sans pool, un enfant dont le parent vient d'être simulé est évalué par delta.
+        """
+        keys = [self.cache_key(ind) for ind in individuals]
+        a_evaluer = {}
+        for key, ind in zip(keys, individuals):
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.cache_hits += 1
+            elif key in a_evaluer:
+                self.cache_hits += 1
+            else:
+                a_evaluer[key] = ind
+                self.cache_misses += 1
+
+        nouveaux = list(a_evaluer.values())
+        debut = time.perf_counter()
+        if self.executor is None:
+            fitness = [self.evaluate(ind, self.references.get(key)) for key, ind in a_evaluer.items()]
+        else:
+            chunksize = max(1, len(nouveaux) // (self.workers * 4))
+            fitness = list(self.executor.map(_evaluer_worker, nouveaux, chunksize=chunksize))
+            if self.profil.actif:
+                for _, stats in fitness:
+                    self.simulation.profil.fusionner(stats)
+                fitness = [nombre_echec for nombre_echec, _ in fitness]
+        if self.profil.actif:
+            # une mesure par individu évalué (hors cache)
+            self.profil.ajouter("evaluation", time.perf_counter() - debut, len(nouveaux))
+        resultats = dict(zip(a_evaluer.keys(), fitness))
+
+        scores = [resultats[key] if key in resultats else self.cache[key] for key in keys]
+        if self.cache_size > 0:
+            for key, nombre_echec in resultats.items():
+                self.cache[key] = nombre_echec
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return scores
+
+    def evaluate_children(self, population):
+        """Évalue les enfants de la génération (fitness encore à None)"""
+        a_evaluer = [i for i, x in enumerate(population) if x[1] is None]
+        fitness = self.evaluate_all([population[i][0] for i in a_evaluer])
+        for i, nombre_echec in zip(a_evaluer, fitness):
+            population[i] = (population[i][0], nombre_echec, population[i][2])
+        self.references.clear()
+        return population
+
+    def add_child(self, population, child, generation, *parents):
+        """
+        Ajoute un enfant à évaluer et retient son parent le plus proche (le moins de gènes différents)
+        comme référence pour l'évaluation par delta
+        """
+        reference = min(parents, key=lambda parent: sum(parent.get(gene) != caroussel for gene, caroussel in child.items()))
+        self.references[self.cache_key(child)] = reference
+        population.append((child, None, generation))
+
+    def start_executor(self):
+        """Démarre les processus de calcul, chacun avec sa copie de la simulation"""
+        if self.workers > 1 and self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                                max_workers=self.workers,
+                                mp_context=multiprocessing.get_context("spawn"),
+                                initializer=_init_worker,
+                                initargs=(self.simulation, self.get_demande(), self.optim_compagnies)
+                                )
+
+    def stop_executor(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
     
     def rank_population(self, population) :
         """Classe la population par fitness (nombre d'échecs)"""
-        ranked = [(ind, self.evaluate(ind),0) for ind in population]
+        ranked = [(ind, fitness,0) for ind, fitness in zip(population, self.evaluate_all(population))]
         return sorted(ranked, key=lambda x: x[1])
     
     def crossover_uniform(self, parent1, parent2):
@@ -116,7 +296,7 @@ class OptimiseurGP(QObject):
     def mutate(self, individual) :
         """Mutation aléatoire"""
         key=random.choice(tuple(individual.keys()))
-        individual[key] = random.randint(1, self.max_carrousel)
+        individual[key] = random.choice(self.caroussels)
         print("mutate",key,individual[key])
         return individual
 
@@ -129,8 +309,9 @@ class OptimiseurGP(QObject):
             child = self.crossover(parent1[0], parent2[0])
             if random.random() < self.mutation_rate:
                 child = self.mutate(child)
-            new_population.append((child, self.evaluate(child),generation))
+            self.add_child(new_population, child, generation, parent1[0], parent2[0])
 
+        new_population=self.evaluate_children(new_population)
         new_population=sorted(new_population, key=lambda x: x[1])
         new_population = new_population[:self.population_size]
         return new_population
@@ -143,9 +324,10 @@ class OptimiseurGP(QObject):
             child = self.crossover(parent1[0], parent2[0])
             if random.random() < self.mutation_rate:
                 child = self.mutate(child)
-            new_population.append((child, self.evaluate(child),generation))
+            self.add_child(new_population, child, generation, parent1[0], parent2[0])
             cpt+=1
 
+        new_population=self.evaluate_children(new_population)
         new_population=sorted(new_population, key=lambda x: x[1])
         new_population = new_population[:self.population_size]
         return new_population
@@ -158,15 +340,29 @@ class OptimiseurGP(QObject):
             child = self.crossover(parent1[0], parent2[0])
             if random.random() < self.mutation_rate:
                 child = self.mutate(child)
-            new_population.append((child, self.evaluate(child),generation))
+            self.add_child(new_population, child, generation, parent1[0], parent2[0])
             cpt+=1
 
+        new_population=self.evaluate_children(new_population)
         new_population=sorted(new_population, key=lambda x: x[1])
         new_population = new_population[:self.population_size]
         return new_population
 
     def run(self) :
         """Exécute l'algorithme génétique"""
+        with self.profil.cprofile("optimisation"):
+            self.get_demande()
+            self.start_executor()
+            try:
+                return self.run_generations()
+            finally:
+                self.stop_executor()
+
+    def get_profil(self):
+        """Mesures par étape de l'optimisation et des simulations (instrumentation activée dans la configuration)"""
+        return {"optimiseur": self.profil.to_dict(), "simulation": self.simulation.profil.to_dict()}
+
+    def run_generations(self) :
         self.progress_updated.emit(0, "initialisation de la population")
         population = self.initialize_population()
         self.progress_updated.emit(0, "calcule de la fitenesse de la population")
@@ -175,6 +371,7 @@ class OptimiseurGP(QObject):
         cpt=0
         for generation in range(self.generations):
             self.current_generation=generation
+            debut_generation = time.perf_counter()
 
             cpt+=1
             if cpt % 3 == 0:
@@ -188,13 +385,19 @@ class OptimiseurGP(QObject):
                 ranked_population=self.makeGeneration_best_worst(ranked_population,generation)
 
             print(generation,":",[(x[1],x[2]) for x in ranked_population])
+            if self.profil.actif:
+                self.profil.ajouter("generation", time.perf_counter() - debut_generation)
             # Calcul du pourcentage de progression
             progress = int((generation / self.generations) * 100)
             best_score = ranked_population[0][1]
-            self.progress_updated.emit(progress, f"Génération {generation}: Meilleur score = {best_score}")
+            self.progress_updated.emit(progress, f"Génération {generation}: Meilleur score = {best_score}"
+                                                 f" (cache: {self.cache_hits} hits / {self.cache_misses} misses)")
             
             if(best_score==0):
                 break
+        if self.profil.actif:
+            self.progress_updated.emit(100, f"Profil optimisation : {self.profil.resume()}")
+            self.progress_updated.emit(100, f"Profil simulation : {self.simulation.profil.resume()}")
         self.progress_updated.emit(100, "Optimisation terminée")
 
         # Retourne le meilleur individu trouvé
@@ -0,0 +1,82 @@
+import os
+import concurrent.futures
+import multiprocessing
+from copy import deepcopy
+
+from onda_simulation import create_simulation
+#-------------------------------------------------------------------------------------------------
+def resume_journee(result, data):
+    """Résumé d'une journée de simulation (totaux et échecs par carrousel)"""
+    daily_result = {
+        "bagages": int(result.nombres("bagages").sum()),
+        "vols": int(result.nombres("vols").sum()),
+        "voyageurs": int(result.nombres("voyageurs").sum()),
+        "nombre_echec": data["nombre_echec"]
+    }
+
+    # Ajouter les données des carrousels
+    for key in data:
+        if key.startswith("caroussel_"):
+            daily_result[key[len("caroussel_"):]] = data[key]["nombre_echec"]
+    return daily_result
+
+def simulate_journees(sim_type, sim_kwargs, params, journees, compagnies_info=None):
+    """
+    Simule une suite de journées [(date_str, vols du jour), ...] et retourne [(date_str, résumé), ...].
+    Exécuté dans un processus de calcul : les vols sont fournis, aucun accès à la base pour les vols
+    (ni pour les compagnies si compagnies_info est fourni).
+    """
+    params = deepcopy(params)
+    resultats = []
+    for date_str, departures in journees:
+        params.date_str = date_str
+        sim = create_simulation(sim_type, params, departures=departures, compagnies_info=compagnies_info, **sim_kwargs)
+        result = sim.run()
+        data = sim.simulate(result)
+        resultats.append((date_str, resume_journee(result, data)))
+    return resultats
+
+def simulate_period(sim_type, sim_kwargs, params, flights_by_date, dates, workers=1, chunksize=1, progress=None, is_running=None,
+                    compagnies_info=None):
+    """
+    Simule chaque date de la liste, en parallèle sur un pool de processus si workers > 1
+    (0 = un processus par cœur). Les journées sont envoyées par paquets de chunksize jours.
+    compagnies_info : {compagnie: carrousel} déjà chargé (None = lu dans la base pour chaque journée).
+    progress(nb_jours_termines, nb_jours, date_str) est appelé à chaque journée terminée,
+    is_running() permet d'interrompre le calcul. Retourne {date_str: résumé} dans l'ordre des dates.
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    chunksize = max(1, chunksize)
+    journees = [(date_str, flights_by_date.get(date_str, [])) for date_str in dates]
+    paquets = [journees[i:i + chunksize] for i in range(0, len(journees), chunksize)]
+
+    daily_results = {}
+    termines = 0
+    if workers == 1:
+        for paquet in paquets:
+            if is_running is not None and not is_running():
+                break
+            for date_str, daily_result in simulate_journees(sim_type, sim_kwargs, params, paquet, compagnies_info):
+                daily_results[date_str] = daily_result
+                termines += 1
+                if progress is not None:
+                    progress(termines, len(journees), date_str)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                    mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(simulate_journees, sim_type, sim_kwargs, params, paquet, compagnies_info) for paquet in paquets]
+            for future in concurrent.futures.as_completed(futures):
+                for date_str, daily_result in future.result():
+                    daily_results[date_str] = daily_result
+                    termines += 1
+                    if progress is not None:
+                        progress(termines, len(journees), date_str)
+                if is_running is not None and not is_running():
+                    for future in futures:
+                        future.cancel()
+                    break
+
+    # Remettre les journées dans l'ordre des dates
+    return {date_str: daily_results[date_str] for date_str in dates if date_str in daily_results}
+#---------------------------------------------------------------------------
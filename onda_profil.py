@@ -0,0 +1,72 @@
+import os
+import time
+import cProfile
+from contextlib import contextmanager, nullcontext
+#-------------------------------------------------------------------------------------------------
+class Profil:
+    """
+    Instrumentation optionnelle : temps cumulé et nombre d'appels par étape.
+    Désactivé, chaque mesure se limite à un test sur self.actif.
+    pstats_dir : répertoire où écrire un fichier cProfile (pstats) par exécution ("" = pas de fichier)
+    """
+    def __init__(self, actif=False, pstats_dir=""):
+        self.actif = actif
+        self.pstats_dir = pstats_dir
+        self.temps = {}
+        self.appels = {}
+
+    def ajouter(self, nom, duree, appels=1):
+        self.temps[nom] = self.temps.get(nom, 0.0) + duree
+        self.appels[nom] = self.appels.get(nom, 0) + appels
+
+    def etape(self, nom):
+        """Mesure le bloc with sous le nom de l'étape"""
+        if not self.actif:
+            return nullcontext()
+        return self.mesure(nom)
+
+    @contextmanager
+    def mesure(self, nom):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ajouter(nom, time.perf_counter() - debut)
+
+    @contextmanager
+    def cprofile(self, nom):
+        """Profile le bloc with avec cProfile et écrit <pstats_dir>/<nom>_<horodatage>.pstats"""
+        if not (self.actif and self.pstats_dir):
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.pstats_dir, exist_ok=True)
+            fichier = os.path.join(self.pstats_dir, f"{nom}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.pstats")
+            profiler.dump_stats(fichier)
+            print(f"Profil cProfile écrit dans {fichier}")
+
+    def fusionner(self, stats):
+        """Ajoute les mesures d'un autre profil (to_dict), par exemple celles d'un processus de calcul"""
+        for nom, mesure in stats.items():
+            self.ajouter(nom, mesure["temps_s"], mesure["appels"])
+
+    def reset(self):
+        self.temps = {}
+        self.appels = {}
+
+    def to_dict(self):
+        """{étape: {"temps_s", "appels", "temps_moyen_ms"}}, étapes triées par temps décroissant"""
+        return {nom: {"temps_s": round(self.temps[nom], 6),
+                      "appels": self.appels[nom],
+                      "temps_moyen_ms": round(1000 * self.temps[nom] / self.appels[nom], 4) if self.appels[nom] else 0.0}
+                for nom in sorted(self.temps, key=self.temps.get, reverse=True)}
+
+    def resume(self):
+        """Résumé sur une ligne : étape temps (appels)"""
+        return ", ".join(f"{nom} {mesure['temps_s']:.3f} s ({mesure['appels']})" for nom, mesure in self.to_dict().items())
+#-------------------------------------------------------------------------------------------------
@@ -0,0 +1,166 @@
+import os
+import concurrent.futures
+import multiprocessing
+from statistics import NormalDist
+
+import numpy as np
+
+from onda_simulation import create_simulation
+#-------------------------------------------------------------------------------------------------
+# Séries par intervalle de temps agrégées sur les réplications
+SERIES = ["Echec", "Bagages_sur_tapis", "Bagages_rejetes"]
+
+def cles_caroussels(data):
+    """Clés caroussel_<n> d'un résultat de simulate(), dans l'ordre numérique des carrousels"""
+    return sorted((key for key in data if key.startswith("caroussel_")), key=lambda key: int(key.split("_")[1]))
+
+def resume_replication(data):
+    """
+    Extrait d'un résultat de simulate() les valeurs agrégées sur les réplications :
+    (total d'échecs, échecs par carrousel, {série: tableau carrousels x intervalles})
+    """
+    caroussels = cles_caroussels(data)
+    echecs = np.array([data[caroussel]["nombre_echec"] for caroussel in caroussels])
+    series = {serie: np.array([data[caroussel][serie] for caroussel in caroussels]) for serie in SERIES}
+    return data["nombre_echec"], echecs, series
+
+def simulate_replication(sim, seed_sequence, antithetique=False):
+    """Une réplication : tirage avec seed_sequence, affectation courante, simulation des carrousels"""
+    return resume_replication(sim.simulate(sim.assign(sim.sample(seed_sequence, antithetique))))
+
+def simulate_paquet(sim, seed_sequences, antithetic=False):
+    """Réplications d'un paquet de graines, chacune suivie de sa réplication antithétique si antithetic"""
+    resultats = []
+    for seed_sequence in seed_sequences:
+        resultats.append(simulate_replication(sim, seed_sequence))
+        if antithetic:
+            resultats.append(simulate_replication(sim, seed_sequence, antithetique=True))
+    return resultats
+
+# Simulation propre à chaque processus de calcul, créée une seule fois au démarrage
+_worker_simulation = None
+
+_worker_antithetic = False
+
+def _init_worker(sim_type, sim_kwargs, params, antithetic):
+    global _worker_simulation, _worker_antithetic
+    _worker_simulation = create_simulation(sim_type, params, **sim_kwargs)
+    _worker_antithetic = antithetic
+
+def _replications_worker(seed_sequences):
+    return simulate_paquet(_worker_simulation, seed_sequences, _worker_antithetic)
+#-------------------------------------------------------------------------------------------------
+def statistiques(valeurs, percentiles):
+    """Moyenne et percentiles sur l'axe des réplications (axe 0)"""
+    valeurs = np.asarray(valeurs, dtype=float)
+    stats = {"moyenne": np.mean(valeurs, axis=0).tolist()}
+    for percentile, valeur in zip(percentiles, np.percentile(valeurs, percentiles, axis=0)):
+        stats[f"p{percentile:g}"] = valeur.tolist()
+    return stats
+
+def intervalle_confiance(valeurs, confidence, antithetic=False):
+    """
+    (moyenne, demi-largeur) de l'intervalle de confiance de la moyenne (approximation normale).
+    antithetic : valeurs par paires antithétiques, l'intervalle est calculé sur les moyennes des paires
+    """
+    if antithetic:
+        valeurs = np.asarray(valeurs, dtype=float).reshape(-1, 2).mean(axis=1)
+    if len(valeurs) < 2:
+        return float(np.mean(valeurs)), float("inf")
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    return float(np.mean(valeurs)), float(z * np.std(valeurs, ddof=1) / np.sqrt(len(valeurs)))
+
+def agreger(resultats, times, caroussels, confidence, percentiles, antithetic=False):
+    """Agrège les résumés des réplications en bandes moyenne / percentiles"""
+    totaux = np.array([total for total, _, _ in resultats])
+    echecs = np.array([echec for _, echec, _ in resultats])
+    moyenne, demi_largeur = intervalle_confiance(totaux, confidence, antithetic)
+    nombre_echec = statistiques(totaux, percentiles)
+    nombre_echec.update({
+        "ecart_type": float(np.std(totaux, ddof=1)) if len(totaux) > 1 else 0.0,
+        "ic_bas": moyenne - demi_largeur,
+        "ic_haut": moyenne + demi_largeur,
+    })
+
+    agregats = {"times": times, "nombre_echec": nombre_echec}
+    for i, caroussel in enumerate(caroussels):
+        agregats[caroussel] = {"nombre_echec": statistiques(echecs[:, i], percentiles)}
+        for serie in SERIES:
+            valeurs = np.array([series[serie][i] for _, _, series in resultats])
+            agregats[caroussel][serie] = statistiques(valeurs, percentiles)
+    return agregats
+#-------------------------------------------------------------------------------------------------
+def simulate_replications(sim_type, sim_kwargs, params, replications=100, workers=1, batch=20,
+                          ci_width=0.0, confidence=0.95, min_replications=10, percentiles=(5, 50, 95),
+                          antithetic=False, progress=None, is_running=None):
+    """
+    Répète la simulation d'une journée avec replications graines indépendantes
+    (SeedSequence(default_seed).spawn), par paquets de batch réplications, en parallèle si workers > 1
+    (0 = un processus par cœur).
+    Arrêt anticipé dès que l'intervalle de confiance du total d'échecs est plus étroit que ci_width
+    (0 = toutes les réplications). Les paquets sont exploités dans l'ordre : le nombre de réplications
+    retenues ne dépend pas du nombre de processus.
+    antithetic : chaque graine donne une paire de réplications antithétiques (2 x replications simulations),
+    l'intervalle de confiance est calculé sur les moyennes des paires.
+    progress(nb_graines, replications, moyenne, demi_largeur) est appelé à chaque paquet terminé
+    (nb_graines : graines traitées, soit deux réplications chacune en mode antithétique).
+    Retourne les bandes moyenne / percentiles par carrousel et par intervalle de temps.
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    batch = max(1, batch)
+    seed_sequences = np.random.SeedSequence(params.default_seed).spawn(replications)
+    paquets = [seed_sequences[i:i + batch] for i in range(0, replications, batch)]
+
+    sim = create_simulation(sim_type, params, **sim_kwargs)
+    result = sim.run()
+    data = sim.simulate(result)
+    times = result["times"]
+    caroussels = cles_caroussels(data)
+
+    resultats = []
+    arret_anticipe = False
+
+    def paquet_termine(resultats_paquet):
+        """Ajoute un paquet et indique si le calcul peut s'arrêter"""
+        resultats.extend(resultats_paquet)
+        moyenne, demi_largeur = intervalle_confiance([total for total, _, _ in resultats], confidence, antithetic)
+        if progress is not None:
+            graines = len(resultats) // 2 if antithetic else len(resultats)
+            progress(graines, replications, moyenne, demi_largeur)
+        return ci_width > 0 and len(resultats) >= min_replications and 2 * demi_largeur <= ci_width
+
+    if workers == 1:
+        for paquet in paquets:
+            if is_running is not None and not is_running():
+                break
+            if paquet_termine(simulate_paquet(sim, paquet, antithetic)):
+                arret_anticipe = True
+                break
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                    mp_context=multiprocessing.get_context("spawn"),
+                                                    initializer=_init_worker,
+                                                    initargs=(sim_type, sim_kwargs, params, antithetic)) as executor:
+            futures = [executor.submit(_replications_worker, paquet) for paquet in paquets]
+            for future in futures:
+                arret = paquet_termine(future.result())
+                if arret or (is_running is not None and not is_running()):
+                    arret_anticipe = arret
+                    for restant in futures:
+                        restant.cancel()
+                    break
+
+    if resultats:
+        agregats = agreger(resultats, times, caroussels, confidence, percentiles, antithetic)
+    else:
+        agregats = {"times": times}
+    agregats.update({
+        "replications": len(resultats),
+        "replications_demandees": replications * 2 if antithetic else replications,
+        "antithetic": antithetic,
+        "arret_anticipe": arret_anticipe,
+        "confidence": confidence,
+    })
+    return agregats
+#---------------------------------------------------------------------------
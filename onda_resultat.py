@@ -0,0 +1,121 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+#-------------------------------------------------------------------------------------------------
+def colonne(slots, valeurs, n_slots):
+    """
+    Colonne intervalle -> valeurs au format compact (bornes, valeurs) :
+    les valeurs de l'intervalle k sont valeurs[bornes[k]:bornes[k+1]].
+    slots doit être trié (les valeurs d'un même intervalle gardent leur ordre).
+    """
+    slots = np.asarray(slots, dtype=np.int32)
+    bornes = np.searchsorted(slots, np.arange(n_slots + 1)).astype(np.int32)
+    return bornes, np.asarray(valeurs, dtype=np.int32)
+
+class VueIntervalles(Sequence):
+    """
+    Vue d'une colonne au format liste de listes (un élément par intervalle) :
+    la liste d'un intervalle n'est construite qu'à la lecture
+    """
+    def __init__(self, nombre, element):
+        self.nombre = nombre
+        self.element = element
+
+    def __len__(self):
+        return self.nombre
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.element(k) for k in range(*index.indices(self.nombre))]
+        if index < 0:
+            index += self.nombre
+        if not 0 <= index < self.nombre:
+            raise IndexError(index)
+        return self.element(index)
+
+class ResultatJournee(Mapping):
+    """
+    Résultat de Simulate.sample() / Simulate.run() au format colonnes NumPy.
+    Les vols sont internés : numéro et carrousel sont stockés une fois dans une table,
+    les colonnes ne contiennent que des indices de vols (int32).
+      vols, enregistrements, manutentionnaires : (bornes, indices des vols) par intervalle
+      passages : (bornes, vol, voyageurs, bagages) par couple (intervalle, vol) dans l'ordre des arrivées,
+                 bagages_voyageurs donne les bagages de chaque voyageur, dans le même ordre
+    Une journée chargée tient en quelques tableaux au lieu de centaines de milliers de petites listes :
+    le résultat est léger à copier vers un processus de calcul.
+    La lecture comme un dictionnaire (result["bagages"]...) donne l'ancien format de listes,
+    construit intervalle par intervalle, pour les graphiques et les exports.
+    """
+    CLES = ("times", "vols", "enregistrements", "manutentionnaires", "voyageurs", "bagages")
+
+    def __init__(self, times, numeros, vols, enregistrements, manutentionnaires, passages, bagages_voyageurs, caroussels=None):
+        self.times = times
+        self.numeros = numeros
+        self.caroussels = caroussels
+        self.vols = vols
+        self.enregistrements = enregistrements
+        self.manutentionnaires = manutentionnaires
+        self.passages = passages
+        self.bagages_voyageurs = bagages_voyageurs
+        # Premier voyageur de chaque couple (intervalle, vol) dans bagages_voyageurs
+        self.debut_voyageurs = np.concatenate(([0], np.cumsum(passages[2]))).astype(np.int64)
+
+    def affecter(self, caroussels):
+        """Même demande affectée aux carrousels (un carrousel par vol de la table numeros)"""
+        return ResultatJournee(self.times, self.numeros, self.vols, self.enregistrements, self.manutentionnaires,
+                               self.passages, self.bagages_voyageurs, list(caroussels))
+
+    def nombres(self, cle):
+        """Nombre d'éléments de la colonne cle par intervalle (nombre de bagages pour "bagages")"""
+        if cle in ("vols", "enregistrements", "manutentionnaires"):
+            return np.diff(getattr(self, cle)[0])
+        bornes, _, voyageurs, bagages = self.passages
+        slots = np.repeat(np.arange(len(self.times)), np.diff(bornes))
+        poids = voyageurs if cle == "voyageurs" else bagages
+        return np.bincount(slots, weights=poids, minlength=len(self.times)).astype(int)
+
+    def vol(self, f):
+        """Élément de l'ancien format pour le vol f : numéro, ou [numéro, carrousel] après affectation"""
+        if self.caroussels is None:
+            return self.numeros[f]
+        return [self.numeros[f], self.caroussels[f]]
+
+    def liste_vols(self, cle, i):
+        bornes, vols = getattr(self, cle)
+        return [self.vol(f) for f in vols[bornes[i]:bornes[i + 1]].tolist()]
+
+    def liste_voyageurs(self, i):
+        bornes, vols, voyageurs, _ = self.passages
+        debut, fin = bornes[i], bornes[i + 1]
+        return [self.numeros[f] for f in np.repeat(vols[debut:fin], voyageurs[debut:fin]).tolist()]
+
+    def liste_bagages(self, i):
+        bornes, vols, voyageurs, _ = self.passages
+        debut, fin = bornes[i], bornes[i + 1]
+        vols = np.repeat(vols[debut:fin], voyageurs[debut:fin]).tolist()
+        bagages = self.bagages_voyageurs[self.debut_voyageurs[debut]:self.debut_voyageurs[fin]].tolist()
+        if self.caroussels is None:
+            return [[self.numeros[f], nb] for f, nb in zip(vols, bagages) if nb]
+        return [[self.numeros[f], nb, self.caroussels[f]] for f, nb in zip(vols, bagages) if nb]
+
+    def __getitem__(self, cle):
+        if cle == "times":
+            return self.times
+        if cle in ("vols", "enregistrements", "manutentionnaires"):
+            return VueIntervalles(len(self.times), lambda i: self.liste_vols(cle, i))
+        if cle == "voyageurs":
+            return VueIntervalles(len(self.times), self.liste_voyageurs)
+        if cle == "bagages":
+            return VueIntervalles(len(self.times), self.liste_bagages)
+        raise KeyError(cle)
+
+    def __iter__(self):
+        return iter(self.CLES)
+
+    def __len__(self):
+        return len(self.CLES)
+
+    def to_dict(self):
+        """Ancien format complet (listes de listes), pour les exports JSON"""
+        return {cle: list(valeur) for cle, valeur in self.items()}
+#-------------------------------------------------------------------------------------------------
@@ -1,304 +1,556 @@
-import random
+import math
 import numpy as np
 from copy import deepcopy
 from typing import Dict, List
 from datetime import datetime,date, time, timedelta
 from typing import List, Dict, Optional
 from collections import defaultdict
-from PyQt5.QtCore import QObject, pyqtSignal
-import concurrent.futures
+from time import perf_counter
 
 from onda_db import DBaircraft
 from onda_config import Params
-
-
-
-
+from onda_profil import Profil
+from onda_evenements import simulate_evenements, resume_intervalles
+from onda_resultat import ResultatJournee, colonne
+
+
+
+
+def inverse_normale(p):
+    """
+    Inverse de la fonction de répartition de la loi normale centrée réduite, vectorisée
+    (approximation rationnelle d'Acklam, erreur relative < 1.2e-9)
+    """
+    a = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+         1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+    b = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+         6.680131188771972e+01, -1.328068155288572e+01]
+    c = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+         -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+    d = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00]
+    p = np.clip(np.asarray(p, dtype=float), 1e-300, 1 - 1e-16)
+    x = np.empty_like(p)
+
+    queue = np.minimum(p, 1 - p) < 0.02425
+    q = np.sqrt(-2 * np.log(np.minimum(p[queue], 1 - p[queue])))
+    x_queue = (((((c[0]*q + c[1])*q + c[2])*q + c[3])*q + c[4])*q + c[5]) / ((((d[0]*q + d[1])*q + d[2])*q + d[3])*q + 1)
+    x[queue] = np.where(p[queue] < 0.5, x_queue, -x_queue)
+
+    q = p[~queue] - 0.5
+    r = q * q
+    x[~queue] = (((((a[0]*r + a[1])*r + a[2])*r + a[3])*r + a[4])*r + a[5])*q / (((((b[0]*r + b[1])*r + b[2])*r + b[3])*r + b[4])*r + 1)
+    return x
+
+def flux(seed_sequence, numero):
+    """
+    Sous-flux numero d'une SeedSequence, sans modifier son compteur (contrairement à spawn) :
+    deux appels avec la même graine donnent toujours les mêmes tirages
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed_sequence.entropy,
+                                                        spawn_key=tuple(seed_sequence.spawn_key) + (numero,)))
+
+def intervalles_actifs(debut, fin, start_min, step_time, n_slots):
+    """
+    Intervalles de temps couverts par des activités ouvertes de debut à fin (minutes entières),
+    comptées toutes les step_time minutes à partir de debut (comptoirs d'enregistrement, manutentionnaires...) :
+    indices [premier, dernier) des intervalles de chaque activité, bornés à la journée
+    """
+    debut = np.asarray(debut, dtype=int)
+    fin = np.asarray(fin, dtype=int)
+    premier = (debut - start_min) // step_time
+    nombre = np.maximum(-((debut - fin) // step_time), 0)
+    dernier = np.clip(premier + nombre, 0, n_slots)
+    premier = np.clip(premier, 0, n_slots)
+    return premier, np.maximum(dernier, premier)
+
+def occupation(premier, dernier, n_slots):
+    """
+    Nombre d'activités ouvertes dans chaque intervalle : tableau de différences (+1 à l'ouverture,
+    -1 à la fermeture) puis somme cumulée, en temps linéaire en activités + intervalles
+    """
+    differences = np.zeros(n_slots + 1, dtype=int)
+    np.add.at(differences, premier, 1)
+    np.add.at(differences, dernier, -1)
+    return np.cumsum(differences[:-1])
+
+def actifs_par_intervalle(premier, dernier, n_slots):
+    """
+    Activités ouvertes dans chaque intervalle, dans l'ordre des activités :
+    (indices, bornes), les activités de l'intervalle k sont indices[bornes[k]:bornes[k+1]]
+    """
+    bornes = np.concatenate(([0], np.cumsum(occupation(premier, dernier, n_slots))))
+    longueurs = dernier - premier
+    activites = np.repeat(np.arange(len(premier)), longueurs)
+    # Intervalle de chaque entrée : premier intervalle de l'activité + rang de l'entrée dans l'activité
+    rangs = np.arange(len(activites)) - np.repeat(np.cumsum(longueurs) - longueurs, longueurs)
+    slots = np.repeat(premier, longueurs) + rangs
+    return activites[np.argsort(slots, kind="stable")], bornes
+
+class TirageAntithetique:
+    """
+    Générateur antithétique d'un np.random.Generator : u -> 1-u et z -> -z.
+    Les lois tirées par inversion (random, standard_normal, uniform) sont antithétiques,
+    les autres (beta, gamma, negative_binomial...) sont tirées sans changement.
+    """
+    def __init__(self, rng):
+        self.rng = rng
+
+    def random(self, size=None):
+        return 1 - self.rng.random(size)
+
+    def standard_normal(self, size=None):
+        return -self.rng.standard_normal(size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        return np.add(low, high) - self.rng.uniform(low, high, size)
+
+    def __getattr__(self, nom):
+        return getattr(self.rng, nom)
+#-------------------------------------------------------------------------------------------------
 class Simulate:
-    def __init__(self,params ,name):
+    def __init__(self,params ,name, departures=None, compagnies_info=None):
+        """
+        departures, compagnies_info : vols du jour et {compagnie: carrousel} déjà chargés
+        (simulation sur une période, optimisation...) ; None = lus dans la base
+        """
         self.params = params
         self.name=name
-        self.init_db()
-
-
-    def init_db(self):
-        self.dbaircraft=DBaircraft(self.params.db_path)
-        self.departures=self.dbaircraft.get_flights( self.params.site, self.params.date_str,self.params.compagnies,self.params.num_vols)  
-        all_compagnies=self.dbaircraft.get_compagnies_info()
+        self.profil = Profil(params.profil, params.profil_pstats_dir)
+        self.init_db(departures, compagnies_info)
+
+
+    def init_db(self, departures=None, compagnies_info=None):
+        self.dbaircraft=DBaircraft(self.params.db_path, cache=self.params.db_cache)
+        # Vols et compagnies pré-chargés : pas d'accès à la base
+        if departures is not None:
+            self.departures=departures
+        else:
+            with self.profil.etape("get_flights"):
+                self.departures=self.dbaircraft.get_flights( self.params.site, self.params.date_str,self.params.compagnies,self.params.num_vols)  
+        if compagnies_info is not None:
+            all_compagnies=compagnies_info
+        else:
+            with self.profil.etape("get_compagnies_info"):
+                all_compagnies=self.dbaircraft.get_compagnies_info()
         departures_compagnies = list(set([flight.company for flight in self.departures]))
         self.compagnies={compagnie:all_compagnies[compagnie]  for compagnie in departures_compagnies}
         self.flights_carrousel={flight.flight_number:all_compagnies[flight.company]  for flight in self.departures}
+        # Carrousels simulés : ceux des zones de la configuration et ceux de la table compagnies
+        self.caroussels = self.params.get_caroussels(all_compagnies.values())
 
     def init_db_compagnies(self,compagnies):
         departures_compagnies = list(set([flight.company for flight in self.departures]))
         self.compagnies={compagnie:compagnies[compagnie]  for compagnie in departures_compagnies}
         self.flights_carrousel={flight.flight_number:compagnies[flight.company]  for flight in self.departures}
+        self.ajouter_caroussels(self.compagnies.values())
 
     def init_db_flights(self,flights):
         self.flights_carrousel={flight.flight_number:flights[flight.flight_number]  for flight in self.departures}
+        self.ajouter_caroussels(self.flights_carrousel.values())
 
-    def distribution(self,departure_min,max_pax):
-        pass
+    def ajouter_caroussels(self, caroussels):
+        """Ajoute aux carrousels simulés ceux d'une nouvelle affectation"""
+        nouveaux = set(caroussels).difference(self.caroussels)
+        if nouveaux:
+            self.caroussels = sorted(nouveaux.union(self.caroussels))
 
+    def distribution(self,departure_min,open_time,close_time,max_pax,rng):
+        """
+        Heures d'arrivée (en minutes) des max_pax voyageurs d'un vol, tirées avec rng (np.random.Generator)
+        """
+        all_arrivals, _ = self.distribution_journee(np.array([departure_min]), np.array([open_time]),
+                                                    np.array([close_time]), np.array([max_pax]), rng)
+        return all_arrivals
 
-    def run(self):
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        """
+        Arrivées de tous les vols de la journée en quelques opérations sur des tableaux.
+        departure_min, open_time, close_time, max_pax : tableaux (un élément par vol).
+        Retourne (heures d'arrivée concaténées vol par vol, indice du vol de chaque arrivée).
+        Par défaut distribution() est appelée vol par vol : une sous-classe peut ne redéfinir que distribution().
+        """
+        if type(self).distribution is Simulate.distribution:
+            raise NotImplementedError(f"{type(self).__name__} doit redéfinir distribution() ou distribution_journee()")
+        arrivees = [np.asarray(self.distribution(depart, ouverture, fermeture, pax, rng), dtype=float)
+                    for depart, ouverture, fermeture, pax in zip(np.asarray(departure_min).tolist(), np.asarray(open_time).tolist(),
+                                                                 np.asarray(close_time).tolist(), np.asarray(max_pax).tolist())]
+        flight_idx = np.repeat(np.arange(len(arrivees)), [len(arrivees_vol) for arrivees_vol in arrivees])
+        return (np.concatenate(arrivees) if arrivees else np.zeros(0)), flight_idx
+
+    def index_vols(self, max_pax):
+        """indice du vol de chaque voyageur et rang du voyageur dans son vol"""
+        flight_idx = np.repeat(np.arange(len(max_pax)), max_pax)
+        debuts = np.cumsum(max_pax) - max_pax
+        return flight_idx, np.arange(len(flight_idx)) - debuts[flight_idx]
+
+    def normaliser_par_vol(self, samples, max_pax, flight_idx):
+        """
+        ramène les tirages de chaque vol sur [0, 1] (min-max par vol, NaN pour un vol d'un seul voyageur)
+        """
+        if len(samples) == 0:
+            return samples
+        debuts = (np.cumsum(max_pax) - max_pax)[max_pax > 0]
+        minimum = np.zeros(len(max_pax))
+        maximum = np.zeros(len(max_pax))
+        minimum[max_pax > 0] = np.minimum.reduceat(samples, debuts)
+        maximum[max_pax > 0] = np.maximum.reduceat(samples, debuts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (samples - minimum[flight_idx]) / (maximum[flight_idx] - minimum[flight_idx])
+
+
+    def run(self, seed_sequence=None, antithetique=False):
         """
         Simule le nombre de bagages enregistrés par intervalle de temps en utilisant une distribution.
         """
+        with self.profil.cprofile(f"run_{self.name.split()[-1]}"):
+            return self.assign(self.sample(seed_sequence, antithetique))
+
+    def seed_sequence(self, candidat=0):
+        """
+        Graine d'un candidat d'un balayage (variation de paramètre, capacité...).
+        Nombres aléatoires communs (params.crn) : tous les candidats partagent les tirages de default_seed,
+        les écarts de résultats ne viennent que du paramètre étudié. Sinon chaque candidat a sa graine.
+        """
+        if self.params.crn:
+            return np.random.SeedSequence(self.params.default_seed)
+        return np.random.SeedSequence([self.params.default_seed, candidat])
+
+    def sample(self, seed_sequence=None, antithetique=False):
+        """
+        Tire les arrivées des voyageurs et leurs bagages pour chaque vol, sans tenir compte des carrousels.
+        Le résultat ne dépend que des vols et de la graine : il peut être réutilisé avec assign()
+        pour évaluer autant d'affectations vol->carrousel que nécessaire.
+        Les arrivées de tous les vols sont tirées en un appel à distribution_journee() avec le flux
+        aléatoire de la réplication : le tirage est identique quel que soit le mode d'exécution
+        (séquentiel, threads, processus).
+        seed_sequence : np.random.SeedSequence de la réplication (par défaut celle de default_seed)
+        antithetique : tirage antithétique de celui de seed_sequence (u -> 1-u, z -> -z)
+        Arrivées et bagages ont des flux séparés, consommés voyageur par voyageur dans l'ordre des vols :
+        avec la même graine, deux paramétrages différents utilisent les mêmes nombres aléatoires.
+        Retourne un ResultatJournee (onda_resultat) : colonnes NumPy, lisibles aussi comme l'ancien dictionnaire de listes.
+        """
         day_start=self.params.day_start
         day_end=self.params.day_end
         step_time=self.params.step_time
-
-        random.seed(self.params.default_seed)
-        np.random.seed(self.params.default_seed)
+        actif = self.profil.actif
+        debut_sample = perf_counter() if actif else 0.0
 
         # Convertir les heures de journée en minutes
         start_min = int(day_start.split(":")[0]) * 60 + int(day_start.split(":")[1])
         end_min = int(day_end.split(":")[0]) * 60 + int(day_end.split(":")[1])
 
         
-        # Initialiser les dictionnaires pour compter les elements par intervalle de temps
-        time_slots_vols = {}
-        time_slots_voyageurs = {}
-        time_slots_bagages= {}
-        time_slots_enregistrements= {}
-        time_slots_manutentionnaires= {}
-        current_time = start_min
-        while current_time < end_min:
-            time_slots_vols[current_time] = []
-            time_slots_voyageurs[current_time] = []
-            time_slots_bagages[current_time] = []
-            time_slots_enregistrements[current_time] = []
-            time_slots_manutentionnaires[current_time] = []
-            current_time += step_time
+        # Intervalles de temps de la journée
+        slots = list(range(start_min, end_min, step_time))
+        n_slots = len(slots)
+        times = [f"{t//60:02d}:{t%60:02d}" for t in slots]
+
+        # Arrivées de tous les vols de la journée
+        departure_min, all_arrivals, flight_idx, nb_bagages = self.tirage(seed_sequence, antithetique)
+        # Table des vols : chaque numéro de vol est stocké une fois, les colonnes contiennent son indice
+        numeros = list(dict.fromkeys(flight.flight_number for flight in self.departures))
+        indices = {numero: f for f, numero in enumerate(numeros)}
+        vol_depart = np.array([indices[flight.flight_number] for flight in self.departures], dtype=np.int32)
+
+        # Vols, enregistrements et manutentionnaires par intervalle
+        if actif:
+            t0 = perf_counter()
+        open_time = departure_min - self.params.open_min
+        close_time = departure_min - self.params.close_min
+        slot_vol = self.slot_indices(departure_min, start_min, step_time, n_slots)
+        ordre = np.argsort(slot_vol, kind="stable")
+        ordre = ordre[slot_vol[ordre] >= 0]
+        vols = colonne(slot_vol[ordre], vol_depart[ordre], n_slots)
+        # Un vol occupe l'enregistrement de open_time à close_time et son manutentionnaire
+        # de open_time au départ, sur des intervalles consécutifs
+        colonnes = []
+        for fin in (close_time, departure_min):
+            vols_actifs, bornes = actifs_par_intervalle(*intervalles_actifs(open_time, fin, start_min, step_time, n_slots), n_slots)
+            colonnes.append((bornes.astype(np.int32), vol_depart[vols_actifs]))
+        enregistrements, manutentionnaires = colonnes
+        if actif:
+            t2 = perf_counter()
+            self.profil.ajouter("slots_vols", t2 - t0)
+
+        arrival_slots = self.slot_indices(all_arrivals, start_min, step_time, n_slots)
+        valides = arrival_slots >= 0
+        arrival_slots = arrival_slots[valides]
+        flight_idx = vol_depart[np.asarray(flight_idx, dtype=int)[valides]]
+        nb_bagages = nb_bagages[valides]
+
+        # Regrouper par intervalle (tri stable : vols dans l'ordre, puis voyageurs dans l'ordre des arrivées),
+        # puis les voyageurs consécutifs d'un même vol dans un même intervalle en un couple (intervalle, vol)
+        ordre = np.argsort(arrival_slots, kind="stable")
+        arrival_slots = arrival_slots[ordre]
+        flight_idx = flight_idx[ordre]
+        nb_bagages = nb_bagages[ordre]
+        debuts = np.flatnonzero((np.diff(arrival_slots, prepend=-1) != 0) | (np.diff(flight_idx, prepend=-1) != 0))
+        voyageurs = np.diff(np.append(debuts, len(arrival_slots)))
+        bagages = np.add.reduceat(nb_bagages, debuts) if len(debuts) else np.zeros(0, dtype=int)
+        bornes, vols_passages = colonne(arrival_slots[debuts], flight_idx[debuts], n_slots)
+        passages = (bornes, vols_passages, voyageurs.astype(np.int32), bagages.astype(np.int32))
+        bagages_voyageurs = nb_bagages.astype(np.min_scalar_type(self.params.max_bagage))
+        if actif:
+            self.profil.ajouter("binning", perf_counter() - t2)
+            self.profil.ajouter("sample", perf_counter() - debut_sample)
+        return ResultatJournee(times, numeros, vols, enregistrements, manutentionnaires, passages, bagages_voyageurs)
+
+    def tirage(self, seed_sequence=None, antithetique=False):
+        """
+        Tirage brut d'une journée, utilisé par sample() et par le moteur à événements :
+        (heure de départ de chaque vol, heure d'arrivée de chaque voyageur, indice de son vol, nombre de ses bagages),
+        heures en minutes depuis minuit
+        """
+        if seed_sequence is None:
+            seed_sequence = np.random.SeedSequence(self.params.default_seed)
+        rng_arrivees = flux(seed_sequence, 0)
+        rng_bagages = flux(seed_sequence, 1)
+        if antithetique:
+            rng_arrivees = TirageAntithetique(rng_arrivees)
+            rng_bagages = TirageAntithetique(rng_bagages)
+
+        with self.profil.etape("distribution"):
+            departure_min = np.array([flight.scheduled_datetime.hour * 60 + flight.scheduled_datetime.minute
+                                      for flight in self.departures], dtype=int)
+            max_pax = np.array([flight.passenger_count for flight in self.departures], dtype=int)
+            arrivees, flight_idx = self.distribution_journee(departure_min,
+                                                             departure_min - self.params.open_min,
+                                                             departure_min - self.params.close_min,
+                                                             max_pax, rng_arrivees)
+
+        # Bagages de chaque voyageur (tirés par inversion pour tous les voyageurs, y compris hors journée,
+        # afin que chaque voyageur garde ses bagages quel que soit le paramétrage)
+        nb_bagages = np.minimum((rng_bagages.random(len(arrivees)) * (self.params.max_bagage + 1)).astype(int),
+                                self.params.max_bagage)
+        return departure_min, np.asarray(arrivees, dtype=float), np.asarray(flight_idx, dtype=int), nb_bagages
+
+    def assign(self, demande):
+        """
+        Affecte la demande tirée par sample() aux carrousels (flights_carrousel courant)
+        et retourne les données au format de run() : seule la table des vols change,
+        les colonnes de la demande sont partagées
+        """
+        with self.profil.etape("assign"):
+            return demande.affecter([self.flights_carrousel[numero] for numero in demande.numeros])
 
-        
-        # Traiter chaque vol
-        for flight in self.departures:
-            max_pax = flight.passenger_count
-            departure_time = flight.scheduled_datetime
-            compagnie_caroussel=self.flights_carrousel[flight.flight_number]
-            hour = departure_time.hour
-            departure_min = departure_time.hour * 60 + departure_time.minute
-            open_time = departure_min - self.params.open_min
-            close_time = departure_min - self.params.close_min
-
-            #info pour les vols
-            for slot in time_slots_vols:
-                if departure_min >= slot and departure_min < slot + step_time:
-                    time_slots_vols[slot].append([flight.flight_number,compagnie_caroussel])
-                    break
-
-            #info pour les enregistrements
-            current_time = open_time
-            while current_time < close_time:
-                for slot in time_slots_enregistrements:
-                   if current_time >= slot and current_time < slot + step_time:
-                        time_slots_enregistrements[slot].append([flight.flight_number,compagnie_caroussel])
-                        break
-                current_time += step_time
-
-            #info pour les manutentionnaires
-            current_time = open_time
-            while current_time < departure_min:
-                for slot in time_slots_manutentionnaires:
-                   if current_time >= slot and current_time < slot + step_time:
-                        time_slots_manutentionnaires[slot].append([flight.flight_number,compagnie_caroussel])
-                        break
-                current_time += step_time
-
-            all_arrivals=self.distribution(departure_min,open_time,close_time,max_pax)
-            for arrival_time in all_arrivals:
-                arrival=int(arrival_time)
-                for slot in time_slots_voyageurs:
-                    if arrival >= slot and arrival < slot + step_time:
-                        time_slots_voyageurs[slot].append(flight.flight_number)
-                        nb_bagages=random.randint(0, self.params.max_bagage)
-                        if nb_bagages:
-                            time_slots_bagages[slot].append([flight.flight_number,nb_bagages,compagnie_caroussel])
-                        break
-            
-        # Préparer les données 
-        times = [f"{t//60:02d}:{t%60:02d}" for t in time_slots_voyageurs.keys()]
-        voyageur_liste = list(time_slots_voyageurs.values())
-        bagage_liste = list(time_slots_bagages.values())
-        enregistrement_liste = list(time_slots_enregistrements.values())
-        manutentionnaire_liste = list(time_slots_manutentionnaires.values())
-        vols_liste = list(time_slots_vols.values())
-        return {"times": times, 
-                "vols":vols_liste,
-                "enregistrements": enregistrement_liste,
-                "manutentionnaires": manutentionnaire_liste,
-                "voyageurs": voyageur_liste,
-                "bagages": bagage_liste
-                }
+    def slot_indices(self, minutes, start_min, step_time, n_slots):
+        """
+        calculer l'indice de l'intervalle de temps de chaque minute (-1 si hors de la journée)
+        """
+        minutes = np.asarray(minutes, dtype=float)
+        valides = np.isfinite(minutes)
+        minutes = np.trunc(np.where(valides, minutes, start_min)).astype(int)
+        indices = (minutes - start_min) // step_time
+        indices[~valides | (minutes < start_min) | (indices >= n_slots)] = -1
+        return indices
 
     def simulate_caroussel(self,data,caroussel):
         """
         Simule le nombre de bagages enregistrés par intervalle de temps en utilisant une distribution.
         """
-        bagages_sur_tapis = []
-        nombre_sur_tapis = 0
-        poids_sur_tapis = 0
-        longueur_sur_tapis = 0
-        bagages_traite_manutentionnaire = self.params.traitement * self.params.step_time 
-        list_bagages_sur_tapis=[]
-        list_poids_sur_tapis=[]
-        list_longueur_sur_tapis=[]
-        list_echec=[]
-        list_poids_depasse=[]
-        list_longueur_depasse=[]
-        list_bagage_non_traites=[]
-        for i in range(len(data["times"])):
-            #print("------------------------------------------------------")
-            #print("i",i)
-            #print("time",data["times"][i])
-
-            manutentionnaires=self.select_caroussel_vols( data["manutentionnaires"][i],caroussel)
-            new_baggages=self.select_caroussel_bagages(data["bagages"][i],caroussel)
-            bagages_sur_tapis=bagages_sur_tapis+new_baggages
-
-            #nombre_sur_tapis_avant = sum(bagage[1] for bagage in bagages_sur_tapis)
-            #print("nombre_sur_tapis-Avant",nombre_sur_tapis_avant)
-            #print("nombre_manutentionnaire",len(manutentionnaires))
-            #print("manutentionnaires",manutentionnaires)
-            #print("Tapis",bagages_sur_tapis)
-            
-            bagages_sur_tapis,nb_reject=self.purge_bagages(bagages_sur_tapis,manutentionnaires)
-            list_bagage_non_traites.append(nb_reject)
-            for manutentionnaire in manutentionnaires:
-                bagages_sur_tapis=self.retirer_bagages(bagages_sur_tapis, manutentionnaire, bagages_traite_manutentionnaire)
-
-            nombre_sur_tapis = sum(bagage[1] for bagage in bagages_sur_tapis)
-            #print("nombre_sur_tapis-Apres",nombre_sur_tapis)
-            #print("nombre_traiter",nombre_sur_tapis_avant-nombre_sur_tapis)
-            
-            
-            poids_sur_tapis = round(nombre_sur_tapis * self.params.poids_moyen_bagage, 2)
-            longueur_sur_tapis = round(nombre_sur_tapis * self.params.longueur_moyenne_bagage, 2)
-            #print("poids_sur_tapis",poids_sur_tapis)
-            #print("longueur_sur_tapis",longueur_sur_tapis)
-            
-            poids_depasse = poids_sur_tapis > self.params.poids_max
-            longueur_depasse = longueur_sur_tapis > self.params.longueur_max
-            echec = poids_depasse or longueur_depasse
-            #print("echec",echec)
-            
-            list_bagages_sur_tapis.append(nombre_sur_tapis)
-            list_poids_sur_tapis.append(poids_sur_tapis)
-            list_longueur_sur_tapis.append(longueur_sur_tapis)
-            list_echec.append(echec)
-            list_poids_depasse.append(poids_depasse)
-            list_longueur_depasse.append(longueur_depasse)
-
-        nombre_echec=sum(1 if(echec) else 0 for echec in list_echec)
+        return self.simulate_caroussels(data, [caroussel])[f"caroussel_{caroussel}"]
 
-        return {
-                "times": data["times"], 
-                "Bagages_sur_tapis": list_bagages_sur_tapis,
-                "Poids_sur_tapis": list_poids_sur_tapis,
-                "Longueur_sur_tapis": list_longueur_sur_tapis,
-                "Echec": list_echec,
-                "Poids_depasse": list_poids_depasse,
-                "Longueur_depasse": list_longueur_depasse,
-                "Bagages_rejetes":list_bagage_non_traites,
-                "nombre_echec":nombre_echec
-                }
+    def simulate_caroussels(self, data, caroussels):
+        """
+        Simule les carrousels demandés en un seul passage sur les intervalles de temps.
+        data : ResultatJournee de run() ou assign(), lu directement sur ses colonnes (indices de vols).
+        Les bagages de tous les carrousels sont suivis dans un seul dictionnaire vol -> nombre :
+        le coût d'un intervalle dépend des vols présents sur les tapis, pas du nombre de carrousels.
+        Poids, longueurs et dépassements sont calculés à la fin sur des tableaux intervalles x carrousels,
+        avec les vecteurs de capacité des carrousels (capacites()).
+        """
+        actif = self.profil.actif
+        debut = perf_counter() if actif else 0.0
+        caroussels = list(caroussels)
+        if not caroussels:
+            return {}
+        indices = {caroussel: k for k, caroussel in enumerate(caroussels)}
+        _, _, traitement = self.capacites(caroussels)
+        bagages_traite_manutentionnaire = dict(zip(caroussels, (traitement * self.params.step_time).tolist()))
+
+        # Indice du carrousel de chaque vol de la table (-1 = carrousel non simulé)
+        caroussel_vol = [indices.get(caroussel, -1) for caroussel in data.caroussels]
+        traitement_vol = [bagages_traite_manutentionnaire.get(caroussel, 0) for caroussel in data.caroussels]
+        bornes_bagages, vols_bagages, _, bagages = (tableau.tolist() for tableau in data.passages)
+        bornes_manutentionnaires, vols_manutentionnaires = (tableau.tolist() for tableau in data.manutentionnaires)
+
+        tapis = {}
+        nombre = [0] * len(caroussels)
+        sur_tapis = []
+        rejetes = []
+        for i in range(len(data.times)):
+            # Nouveaux bagages des carrousels simulés
+            for p in range(bornes_bagages[i], bornes_bagages[i + 1]):
+                vol = vols_bagages[p]
+                k = caroussel_vol[vol]
+                if k >= 0 and bagages[p]:
+                    tapis[vol] = tapis.get(vol, 0) + bagages[p]
+                    nombre[k] += bagages[p]
+            manutentionnaires = [vol for vol in vols_manutentionnaires[bornes_manutentionnaires[i]:bornes_manutentionnaires[i + 1]]
+                                 if caroussel_vol[vol] >= 0]
+
+            # Enlever les bagages des vols déjà partis (plus de manutentionnaire)
+            if actif:
+                t0 = perf_counter()
+            rejet = [0] * len(caroussels)
+            presents = set(manutentionnaires)
+            for vol in [vol for vol in tapis if vol not in presents]:
+                k = caroussel_vol[vol]
+                nb = tapis.pop(vol)
+                rejet[k] += nb
+                nombre[k] -= nb
+            if actif:
+                t1 = perf_counter()
+                self.profil.ajouter("purge", t1 - t0)
+
+            # Retrait des bagages par les manutentionnaires
+            for vol in manutentionnaires:
+                nb = tapis.get(vol, 0)
+                if nb == 0:
+                    continue
+                retires = min(nb, traitement_vol[vol])
+                if retires == nb:
+                    del tapis[vol]
+                else:
+                    tapis[vol] = nb - retires
+                nombre[caroussel_vol[vol]] -= retires
+            if actif:
+                self.profil.ajouter("retrait", perf_counter() - t1)
+
+            sur_tapis.append(list(nombre))
+            rejetes.append(rejet)
+
+        if actif:
+            t0 = perf_counter()
+        sur_tapis = np.array(sur_tapis, dtype=int).reshape(len(data.times), len(caroussels))
+        rejetes = np.array(rejetes, dtype=int).reshape(sur_tapis.shape)
+        results = self.resultats_caroussels(data.times, caroussels, sur_tapis, rejetes)
+        if actif:
+            fin = perf_counter()
+            self.profil.ajouter("resultats", fin - t0)
+            self.profil.ajouter("simulate_caroussels", fin - debut)
+        return results
+
+    def resultats_caroussels(self, times, caroussels, sur_tapis, rejetes):
+        """
+        Séries par carrousel au format de simulate() à partir des tableaux intervalles x carrousels
+        des bagages présents sur les tapis en fin d'intervalle et des bagages rejetés
+        """
+        poids_max, longueur_max, _ = self.capacites(caroussels)
+        poids_sur_tapis = np.round(sur_tapis * self.params.poids_moyen_bagage, 2)
+        longueur_sur_tapis = np.round(sur_tapis * self.params.longueur_moyenne_bagage, 2)
+        # Dépassements de tous les carrousels et de tous les intervalles en une comparaison
+        # (diffusion des vecteurs de capacité sur les colonnes)
+        poids_depasse = poids_sur_tapis > poids_max
+        longueur_depasse = longueur_sur_tapis > longueur_max
+        echec = poids_depasse | longueur_depasse
+        nombre_echec = echec.sum(axis=0).tolist()
+
+        colonnes = {
+            "Bagages_sur_tapis": sur_tapis.T.tolist(),
+            "Poids_sur_tapis": poids_sur_tapis.T.tolist(),
+            "Longueur_sur_tapis": longueur_sur_tapis.T.tolist(),
+            "Echec": echec.T.tolist(),
+            "Poids_depasse": poids_depasse.T.tolist(),
+            "Longueur_depasse": longueur_depasse.T.tolist(),
+            "Bagages_rejetes": rejetes.T.tolist(),
+        }
+        results = {}
+        for k, caroussel in enumerate(caroussels):
+            results[f"caroussel_{caroussel}"] = {"times": times}
+            results[f"caroussel_{caroussel}"].update({serie: valeurs[k] for serie, valeurs in colonnes.items()})
+            results[f"caroussel_{caroussel}"]["nombre_echec"] = nombre_echec[k]
+        return results
+
+    def capacites(self, caroussels):
+        """
+        Vecteurs de capacité des carrousels (params.capacite) :
+        (poids max, longueur max, bagages traités par minute et par manutentionnaire)
+        """
+        capacites = [self.params.capacite(caroussel) for caroussel in caroussels]
+        return tuple(np.array([capacite[i] for capacite in capacites]) for i in range(3))
+
+    def simulate_capacite(self, data, previous, caroussel, **capacite):
+        """
+        Re-simule un seul carrousel avec une nouvelle capacité (max_weight, max_length, processing_rate) :
+        la capacité d'un carrousel n'agit que sur ses propres bagages, les autres carrousels
+        de previous (résultat de simulate()) sont repris tels quels
+        """
+        self.params.set_capacite(caroussel, **capacite)
+        return self.simulate_delta(data, previous, [caroussel])
 
     def simulate(self, data):
-        """Exécute les simulations des carrousels en parallèle"""
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            # Soumettre toutes les tâches de simulation
-            futures = {
-                executor.submit(self.simulate_caroussel, data, i): i 
-                for i in range(1, 6)
-            }
-            
-            # Créer un dictionnaire pour stocker les résultats
-            results = {}
-            
-            # Attendre que toutes les tâches se terminent et récupérer les résultats
-            for future in concurrent.futures.as_completed(futures):
-                caroussel_num = futures[future]
-                try:
-                    results[f"caroussel_{caroussel_num}"] = future.result()
-                except Exception as exc:
-                    print(f'Carrousel {caroussel_num} a généré une exception: {exc}')
-                    # En cas d'erreur, créer un résultat vide
-                    results[f"caroussel_{caroussel_num}"] = {
-                        "times": data["times"],
-                        "Bagages_sur_tapis": [0] * len(data["times"]),
-                        "Poids_sur_tapis": [0] * len(data["times"]),
-                        "Longueur_sur_tapis": [0] * len(data["times"]),
-                        "Echec": [False] * len(data["times"]),
-                        "Poids_depasse": [False] * len(data["times"]),
-                        "Longueur_depasse": [False] * len(data["times"]),
-                        "Bagages_rejetes": [0] * len(data["times"]),
-                        "nombre_echec": 0
-                    }
+        """Simule les carrousels de la topologie (self.caroussels) en un seul passage sur les intervalles de temps"""
+        results = self.simulate_caroussels(data, self.caroussels)
 
         # Calculer le nombre total d'échecs
-        total_echecs = sum(results[f"caroussel_{i}"]["nombre_echec"] for i in range(1, 6))
+        total_echecs = self.total_echecs(results)
         
         # Ajouter le total au dictionnaire de résultats
         results["nombre_echec"] = total_echecs
         
         return results
 
-
-    def retirer_bagages(self,liste, vol, nombre_bagages):
+    def simulate_delta(self, data, previous, caroussels):
         """
-        retirer des bagages lu tapis
+        Met à jour un résultat de simulate() en ne re-simulant que les carrousels modifiés.
+        data doit refléter la nouvelle affectation, previous est le résultat de l'ancienne.
+        Les carrousels absents de previous (ajoutés par la nouvelle affectation) sont simulés en entier.
         """
-        bagages_restants = nombre_bagages
-        nouvelle_liste = []
-        
-        for item in liste:
-            if item[0] == vol and bagages_restants > 0:
-                if item[1] <= bagages_restants:
-                    bagages_restants -= item[1]
-                    continue  # On retire complètement cet élément
-                else:
-                    item[1] -= bagages_restants
-                    bagages_restants = 0
-                    nouvelle_liste.append(item)
-            else:
-                nouvelle_liste.append(item)
-        
-        return nouvelle_liste
+        results = {key: value for key, value in previous.items() if key.startswith("caroussel_")}
+        nouveaux = [caroussel for caroussel in self.caroussels if f"caroussel_{caroussel}" not in results]
+        results.update(self.simulate_caroussels(data, sorted(set(caroussels).union(nouveaux))))
+        results["nombre_echec"] = self.total_echecs(results)
+        return results
 
-    def purge_bagages(self,liste,vols):
-        """
-        enlever les bagages des vols déjà partis 
-        """
-        nouvelle_liste = []
-        bagages_rejete = 0
-        for item in liste:
-            if item[0]  in vols:
-                nouvelle_liste.append(item)
-            else:
-                bagages_rejete += item[1]
-        return nouvelle_liste,bagages_rejete
+    def total_echecs(self, results):
+        """Nombre total d'échecs des carrousels présents dans results"""
+        return sum(value["nombre_echec"] for key, value in results.items() if key.startswith("caroussel_"))
 
-    def select_caroussel_bagages(self,liste,caroussel):
+    def simulate_evenements(self, seed_sequence=None, antithetique=False, delai_injection=0.0):
         """
-        recuperer les bagages affectés à ce caroussel
+        Variante de simulate(run()) avec le moteur à événements discrets (onda_evenements) :
+        arrivées des voyageurs, dépôts des bagages, retraits bagage par bagage par le manutentionnaire
+        de chaque vol (params.capacite : bagages/min) et départs des vols sont traités à l'heure exacte.
+        Le coût dépend du nombre de bagages et non du nombre d'intervalles : adapté à step_time=1.
+        Retourne le résumé par intervalle de temps au format de simulate().
         """
-        nouvelle_liste = []
-        for item in liste:
-            if item[2]  == caroussel :
-                nouvelle_liste.append(item)
-        return nouvelle_liste
-    def select_caroussel_vols(self,liste,caroussel):
+        with self.profil.etape("simulate_evenements"):
+            start_min = int(self.params.day_start.split(":")[0]) * 60 + int(self.params.day_start.split(":")[1])
+            end_min = int(self.params.day_end.split(":")[0]) * 60 + int(self.params.day_end.split(":")[1])
+            slots = list(range(start_min, end_min, self.params.step_time))
+            times = [f"{t//60:02d}:{t%60:02d}" for t in slots]
+
+            departure_min, arrivees, flight_idx, nb_bagages = self.tirage(seed_sequence, antithetique)
+            # Comme sample(), les voyageurs arrivés hors de la journée sont ignorés
+            valides = self.slot_indices(arrivees, start_min, self.params.step_time, len(slots)) >= 0
+
+            indices = {caroussel: k for k, caroussel in enumerate(self.caroussels)}
+            caroussel_vol = np.array([indices.get(self.flights_carrousel[flight.flight_number], -1)
+                                      for flight in self.departures], dtype=int)
+            _, _, traitement = self.capacites(self.caroussels)
+            debit = np.append(traitement, 0)[caroussel_vol]  # -1 (carrousel non simulé) : débit nul
+
+            mouvements, rejets = simulate_evenements(departure_min - self.params.open_min, departure_min, caroussel_vol, debit,
+                                                     arrivees[valides], flight_idx[valides], nb_bagages[valides],
+                                                     delai_injection)
+            sur_tapis, rejetes = resume_intervalles(mouvements, rejets, caroussel_vol, len(self.caroussels),
+                                                    start_min, self.params.step_time, len(slots))
+            results = self.resultats_caroussels(times, self.caroussels, sur_tapis, rejetes)
+            results["nombre_echec"] = self.total_echecs(results)
+        return results
+
+    def caroussels_modifies(self, ancienne, nouvelle):
         """
-        # recuperer les vols affectés à ce caroussel
+        carrousels touchés par les gènes (compagnies ou vols) dont l'affectation a changé
         """
-        nouvelle_liste = []
-        for item in liste:
-            if item[1]  == caroussel :
-                nouvelle_liste.append(item[0])
-        return nouvelle_liste
- 
+        caroussels = set()
+        for gene, caroussel in nouvelle.items():
+            if ancienne.get(gene) != caroussel:
+                caroussels.add(caroussel)
+                if gene in ancienne:
+                    caroussels.add(ancienne[gene])
+        return caroussels
 
 #---------------------------------------------------------------------------
 """
@@ -308,24 +560,15 @@ Modèle :Pour chaque vol, les passagers sont distribués uniformément sur la pl
 
 """
 class Simulate_uniforme(Simulate):
-    def __init__(self,params):
-        super().__init__(params,"Distribution uniforme") 
-
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        all_arrivals = []
-        duration = close_time - open_time
-     
-        if max_pax == 0:
-            return all_arrivals
-            
-        # Calcul du pas entre chaque passager
-        step = duration / (max_pax + 1)
-
-        # Répartition équitable des passagers dans l'intervalle
-        for i in range(1, max_pax + 1):
-            arrival_time = open_time + i * step
-            all_arrivals.append(arrival_time)            
-        return all_arrivals
+    def __init__(self,params, departures=None, compagnies_info=None):
+        super().__init__(params,"Distribution uniforme", departures, compagnies_info) 
+
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        # Répartition équitable des passagers de chaque vol dans l'intervalle
+        flight_idx, rang = self.index_vols(max_pax)
+        step = (close_time - open_time) / (max_pax + 1)
+        all_arrivals = open_time[flight_idx] + (rang + 1) * step[flight_idx]
+        return all_arrivals, flight_idx
 #---------------------------------------------------------------------------
 """
  Distribution Normale (Gaussienne)
@@ -344,23 +587,35 @@ Paramètres ajustables :
 
 """
 class Simulate_normale(Simulate):
-    def __init__(self,params,sigma_minutes= 20):
-        super().__init__(params,"Distribution normale") 
+    def __init__(self,params,sigma_minutes= 20, departures=None, compagnies_info=None):
+        super().__init__(params,"Distribution normale", departures, compagnies_info) 
         self.sigma_minutes= sigma_minutes   # Écart-type de la distribution (en minutes)
 
-    def distribution(self,departure_min,open_time,close_time,max_pax):
-        mean_time = departure_min - (self.params.open_min+self.params.close_min )/2   # Milieu de la plage (1h15 avant)
-        sigma_minutes = self.sigma_minutes         
-        all_arrivals=[]
-        for _ in range(max_pax):
-            while True:
-                # Générer un temps aléatoire selon une distribution normale
-                arrival_time = np.random.normal(loc=mean_time, scale=sigma_minutes)
-                # Vérifier qu'il est dans la plage autorisée
-                if open_time <= arrival_time <= close_time:
-                    break
-            all_arrivals.append(arrival_time)
-        return all_arrivals
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        # La plage autorisée est la même pour tous les vols, relativement au départ :
+        # tous les décalages sont tirés dans une seule loi normale tronquée
+        flight_idx, _ = self.index_vols(max_pax)
+        mean_offset = -(self.params.open_min + self.params.close_min) / 2   # Milieu de la plage (1h15 avant)
+        offsets = self.normale_tronquee(rng, mean_offset, self.sigma_minutes,
+                                        -self.params.open_min, -self.params.close_min, len(flight_idx))
+        return departure_min[flight_idx] + offsets, flight_idx
+
+    def normale_tronquee(self, rng, mean_time, sigma_minutes, open_time, close_time, max_pax):
+        """
+        Loi normale tronquée à [open_time, close_time] par inversion : un tirage uniforme par voyageur
+        entre les probabilités des bornes, transformé par l'inverse de la fonction de répartition
+        (même loi que le rejet, mais un nombre aléatoire par voyageur quel que soit sigma)
+        """
+        if max_pax <= 0:
+            return np.empty(0)
+        if sigma_minutes <= 0:
+            return np.full(max_pax, float(np.clip(mean_time, open_time, close_time)))
+
+        def cdf(x):
+            return 0.5 * (1 + math.erf((x - mean_time) / (sigma_minutes * math.sqrt(2))))
+        p_open, p_close = cdf(open_time), cdf(close_time)
+        u = p_open + (p_close - p_open) * rng.random(max_pax)
+        return np.clip(mean_time + sigma_minutes * inverse_normale(u), open_time, close_time)
 
 
 #---------------------------------------------------------------------------
@@ -383,18 +638,16 @@ lambda_param=0.03 : Valeur par défaut (essayez 0.02 à 0.05)
 
 """
 class Simulate_poisson(Simulate):
-    def __init__(self,params,lambda_param=0.03):
-        super().__init__(params,"Distribution poisson") 
+    def __init__(self,params,lambda_param=0.03, departures=None, compagnies_info=None):
+        super().__init__(params,"Distribution poisson", departures, compagnies_info) 
         self.lambda_param=lambda_param #Paramètre de taux pour la distribution exponentielle
 
-    def distribution(self,departure_min,open_time,close_time,max_pax):
-        window_duration = close_time - open_time
-        all_arrivals=[]
-        for _ in range(max_pax):
-            arrival_offset = np.random.exponential(scale=1/self.lambda_param)
-            arrival_time = open_time + min(arrival_offset, window_duration)
-            all_arrivals.append(arrival_time)
-        return all_arrivals
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        flight_idx, _ = self.index_vols(max_pax)
+        window_duration = (close_time - open_time)[flight_idx]
+        arrival_offset = -np.log1p(-rng.random(len(flight_idx))) / self.lambda_param   # loi exponentielle par inversion
+        all_arrivals = open_time[flight_idx] + np.minimum(arrival_offset, window_duration)
+        return all_arrivals, flight_idx
 
 #---------------------------------------------------------------------------
 """
@@ -417,16 +670,17 @@ Paramètres Recommandés :
     Pour des retardataires : α=3, β=1
 """
 class Simulate_beta(Simulate):
-    def __init__(self,params,alpha=1,beta=3):
-        super().__init__(params,"Distribution beta") 
+    def __init__(self,params,alpha=1,beta=3, departures=None, compagnies_info=None):
+        super().__init__(params,"Distribution beta", departures, compagnies_info) 
         self.alpha=alpha  #Paramètre alpha de la distribution Beta (contrôle la forme gauche)
         self.beta=beta   #Paramètre beta de la distribution Beta (contrôle la forme droite)
 
-    def distribution(self,departure_min,open_time,close_time,max_pax):
-        window_duration = close_time - open_time
-        beta_samples = np.random.beta(self.alpha, self.beta, size=max_pax)
-        arrival_times = open_time + beta_samples * window_duration
-        return arrival_times
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        flight_idx, _ = self.index_vols(max_pax)
+        window_duration = (close_time - open_time)[flight_idx]
+        beta_samples = rng.beta(self.alpha, self.beta, size=len(flight_idx))
+        arrival_times = open_time[flight_idx] + beta_samples * window_duration
+        return arrival_times, flight_idx
 
 
 #---------------------------------------------------------------------------
@@ -446,32 +700,25 @@ Avantages :
     Permet d'ajuster finement les deux pics observés dans les aéroports
 """
 class Simulate_bimodal(Simulate):
-    def __init__(self,params,early_mean=90,early_std=20,late_mean=45,late_std=15,early_weight=0.7):
-        super().__init__(params,"Distribution bimodal") 
+    def __init__(self,params,early_mean=90,early_std=20,late_mean=45,late_std=15,early_weight=0.7, departures=None, compagnies_info=None):
+        super().__init__(params,"Distribution bimodal", departures, compagnies_info) 
         self.early_mean=early_mean     # Moyenne pour les early-birds (minutes avant le vol)
         self.early_std=early_std       # Écart-type pour les early-birds
         self.late_mean=late_mean       # Moyenne pour les last-minute (minutes avant le vol)
         self.late_std=late_std         # Écart-type pour les last-minute
         self.early_weight=early_weight # Proportion de passagers early-birds (0-1) 70% early, 30% late
 
-    def distribution(self,departure_min,open_time,close_time,max_pax):
-    
-        # Générer les temps d'arrivée (mélange de deux distributions normales)
-        n_early = int(max_pax * self.early_weight)
-        n_late = max_pax - n_early
-    
-        # Early birds (pic vers 1h30 avant)
-        early_arrivals = np.random.normal(loc=departure_min - self.early_mean, 
-                                    scale=self.early_std, 
-                                    size=n_early)
-    
-        # Last-minute (pic vers 45min avant)
-        late_arrivals = np.random.normal(loc=departure_min - self.late_mean, 
-                                    scale=self.late_std, 
-                                    size=n_late)
-        all_arrivals = np.concatenate([early_arrivals, late_arrivals])
-        all_arrivals = np.clip(all_arrivals, open_time, close_time)
-        return all_arrivals
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        # Générer les temps d'arrivée (mélange de deux distributions normales) :
+        # les n_early premiers voyageurs de chaque vol sont des early birds (pic vers 1h30 avant),
+        # les suivants des last-minute (pic vers 45min avant)
+        flight_idx, rang = self.index_vols(max_pax)
+        n_early = (max_pax * self.early_weight).astype(int)
+        early = rang < n_early[flight_idx]
+        all_arrivals = (departure_min[flight_idx] - np.where(early, self.early_mean, self.late_mean)
+                        + np.where(early, self.early_std, self.late_std) * rng.standard_normal(len(flight_idx)))
+        all_arrivals = np.clip(all_arrivals, open_time[flight_idx], close_time[flight_idx])
+        return all_arrivals, flight_idx
 
 #------------------------------------------------------------------------------------------------- 
 """
@@ -483,18 +730,19 @@ Paramètres :
 	sigma : écart-type du logarithme des temps.
 """
 class Simulate_lognormale(Simulate):
-    def __init__(self, params, mu=4.0, sigma=0.5):
-        super().__init__(params, "Distribution log-normale")
+    def __init__(self, params, mu=4.0, sigma=0.5, departures=None, compagnies_info=None):
+        super().__init__(params, "Distribution log-normale", departures, compagnies_info)
         self.mu = mu
         self.sigma = sigma
 
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        window_duration = close_time - open_time
-        log_samples = np.random.lognormal(mean=self.mu, sigma=self.sigma, size=max_pax)
-        # Normaliser pour ajuster à la plage horaire
-        log_samples = (log_samples - np.min(log_samples)) / (np.max(log_samples) - np.min(log_samples))
-        arrival_times = open_time + log_samples * window_duration
-        return arrival_times
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        flight_idx, _ = self.index_vols(max_pax)
+        window_duration = (close_time - open_time)[flight_idx]
+        log_samples = np.exp(self.mu + self.sigma * rng.standard_normal(len(flight_idx)))
+        # Normaliser pour ajuster à la plage horaire de chaque vol
+        log_samples = self.normaliser_par_vol(log_samples, max_pax, flight_idx)
+        arrival_times = open_time[flight_idx] + log_samples * window_duration
+        return arrival_times, flight_idx
 #------------------------------------------------------------------------------------------------- 
 """
 Distribution Gamma
@@ -504,20 +752,19 @@ Paramètres :
 	scale (θ) : contrôle l'échelle.
 """
 class Simulate_gamma(Simulate):
-    def __init__(self, params, shape=2.0, scale=30.0):
-        super().__init__(params, "Distribution Gamma")
+    def __init__(self, params, shape=2.0, scale=30.0, departures=None, compagnies_info=None):
+        super().__init__(params, "Distribution Gamma", departures, compagnies_info)
         self.shape = shape
         self.scale = scale
 
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        window_duration = close_time - open_time
-        if max_pax==0:
-            return []
-        gamma_samples = np.random.gamma(shape=self.shape, scale=self.scale, size=max_pax)
-        # Normaliser pour ajuster à la plage horaire
-        gamma_samples = (gamma_samples - np.min(gamma_samples)) / (np.max(gamma_samples) - np.min(gamma_samples))
-        arrival_times = open_time + gamma_samples * window_duration
-        return arrival_times
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        flight_idx, _ = self.index_vols(max_pax)
+        window_duration = (close_time - open_time)[flight_idx]
+        gamma_samples = rng.gamma(shape=self.shape, scale=self.scale, size=len(flight_idx))
+        # Normaliser pour ajuster à la plage horaire de chaque vol
+        gamma_samples = self.normaliser_par_vol(gamma_samples, max_pax, flight_idx)
+        arrival_times = open_time[flight_idx] + gamma_samples * window_duration
+        return arrival_times, flight_idx
 #------------------------------------------------------------------------------------------------- 
 """
 Distribution de Weibull
@@ -527,18 +774,19 @@ Paramètres :
 	scale (λ) : étire la distribution.
 """
 class Simulate_weibull(Simulate):
-    def __init__(self, params, shape=1.5, scale=60.0):
-        super().__init__(params, "Distribution Weibull")
+    def __init__(self, params, shape=1.5, scale=60.0, departures=None, compagnies_info=None):
+        super().__init__(params, "Distribution Weibull", departures, compagnies_info)
         self.shape = shape
         self.scale = scale
 
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        window_duration = close_time - open_time
-        weibull_samples = np.random.weibull(a=self.shape, size=max_pax) * self.scale
-        # Normaliser pour ajuster à la plage horaire
-        weibull_samples = (weibull_samples - np.min(weibull_samples)) / (np.max(weibull_samples) - np.min(weibull_samples))
-        arrival_times = open_time + weibull_samples * window_duration
-        return arrival_times
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        flight_idx, _ = self.index_vols(max_pax)
+        window_duration = (close_time - open_time)[flight_idx]
+        weibull_samples = (-np.log1p(-rng.random(len(flight_idx)))) ** (1 / self.shape) * self.scale   # par inversion
+        # Normaliser pour ajuster à la plage horaire de chaque vol
+        weibull_samples = self.normaliser_par_vol(weibull_samples, max_pax, flight_idx)
+        arrival_times = open_time[flight_idx] + weibull_samples * window_duration
+        return arrival_times, flight_idx
 #------------------------------------------------------------------------------------------------- 
 """
 Distribution Tri-modale
@@ -549,22 +797,24 @@ Paramètres :
 	weights : proportions de passagers pour chaque pic (ex : [0.5, 0.3, 0.2]).
 """
 class Simulate_trimodal(Simulate):
-    def __init__(self, params, means=[150, 120, 90], stds=[20, 15, 10], weights=[0.5, 0.3, 0.2]):
-        super().__init__(params, "Distribution Tri-modale")
+    def __init__(self, params, means=[150, 120, 90], stds=[20, 15, 10], weights=[0.5, 0.3, 0.2], departures=None, compagnies_info=None):
+        super().__init__(params, "Distribution Tri-modale", departures, compagnies_info)
         self.means = means
         self.stds = stds
         self.weights = weights
 
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        n_per_mode = [int(max_pax * w) for w in self.weights]
-        n_per_mode[-1] = max_pax - sum(n_per_mode[:-1])  
-        
-        arrivals = []
-        for mean, std, n in zip(self.means, self.stds, n_per_mode):
-            arrivals.extend(np.random.normal(loc=departure_min - mean, scale=std, size=n))
-        
-        arrivals = np.clip(arrivals, open_time, close_time)
-        return arrivals
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        # Nombre de voyageurs de chaque pic par vol, le dernier pic reçoit le reste
+        n_per_mode = (np.asarray(self.weights[:-1], dtype=float)[:, None] * max_pax).astype(int)
+        bornes = np.cumsum(n_per_mode, axis=0)
+
+        # Pic de chaque voyageur selon son rang dans le vol
+        flight_idx, rang = self.index_vols(max_pax)
+        mode = (rang >= bornes[:, flight_idx]).sum(axis=0)
+        arrivals = (departure_min[flight_idx] - np.asarray(self.means)[mode]
+                    + np.asarray(self.stds)[mode] * rng.standard_normal(len(flight_idx)))
+        arrivals = np.clip(arrivals, open_time[flight_idx], close_time[flight_idx])
+        return arrivals, flight_idx
 #------------------------------------------------------------------------------------------------- 
 """
 Distribution Pareto (pour modéliser les extrêmes)
@@ -575,16 +825,17 @@ Paramètres :
 	scale : paramètre d'échelle.
 """
 class Simulate_pareto(Simulate):
-    def __init__(self, params, alpha=2.0, scale=30.0):
-        super().__init__(params, "Distribution Pareto")
+    def __init__(self, params, alpha=2.0, scale=30.0, departures=None, compagnies_info=None):
+        super().__init__(params, "Distribution Pareto", departures, compagnies_info)
         self.alpha = alpha
         self.scale = scale
 
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        pareto_samples = (np.random.pareto(a=self.alpha, size=max_pax) + 1) * self.scale
-        arrival_times = departure_min - pareto_samples
-        arrival_times = np.clip(arrival_times, open_time, close_time)
-        return arrival_times
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        flight_idx, _ = self.index_vols(max_pax)
+        pareto_samples = (1 - rng.random(len(flight_idx))) ** (-1 / self.alpha) * self.scale   # par inversion
+        arrival_times = departure_min[flight_idx] - pareto_samples
+        arrival_times = np.clip(arrival_times, open_time[flight_idx], close_time[flight_idx])
+        return arrival_times, flight_idx
 #------------------------------------------------------------------------------------------------- 
 """
 Distribution Binomiale Négative
@@ -601,48 +852,96 @@ Paramètres Recommandés :
     Pour les voyageurs : mu=8, k=4 (basé sur vos données)
 """
 class Simulate_binomialnegatif(Simulate):
-    def __init__(self, params, mu=8, k=4):
-        super().__init__(params, "Distribution Binomiale Négative")
+    def __init__(self, params, mu=8, k=4, departures=None, compagnies_info=None):
+        super().__init__(params, "Distribution Binomiale Négative", departures, compagnies_info)
         self.mu = mu  # Moyenne de la distribution
         self.k = k    # Paramètre de dispersion (plus k est petit, plus la dispersion est grande)
         
         # Conversion mu/k vers les paramètres n/p de la Binomiale Négative
         self.p = k / (k + mu)  # Probabilité de succès
         self.n = k             # Nombre de succès
-    def distribution(self, departure_min, open_time, close_time, max_pax):
-        window_duration = close_time - open_time
-        if max_pax == 0:
-            return []
-        
-        # Générer les temps d'arrivée par tranches de 10 minutes
-        time_slots = np.arange(open_time, close_time, 10)
-        n_slots = len(time_slots)
-        
+    def distribution_journee(self, departure_min, open_time, close_time, max_pax, rng):
+        # Tranches de 10 minutes de chaque vol (une ligne par vol)
+        n_slots = np.ceil((close_time - open_time) / 10).astype(int).clip(min=0)
+        tranches = np.arange(n_slots.max() if len(n_slots) else 0)
+        dans_plage = (tranches < n_slots[:, None]) & (max_pax > 0)[:, None]
+
         # Générer les proportions par tranche avec Binomiale Négative
-        arrivals_per_slot = np.random.negative_binomial(n=self.n, p=self.p, size=n_slots)
-        
-        # Normaliser et ajuster pour obtenir exactement max_pax arrivées
-        arrivals_per_slot = (arrivals_per_slot / np.sum(arrivals_per_slot) * max_pax).astype(int)
-        remaining = max_pax - np.sum(arrivals_per_slot)
-        
-        # Distribuer les restants dans les tranches aléatoirement
-        if remaining > 0:
-            indices = np.random.choice(n_slots, remaining, replace=True)
-            np.add.at(arrivals_per_slot, indices, 1)
-        
-        # Générer les temps exacts
-        all_arrivals = []
-        for slot_idx, count in enumerate(arrivals_per_slot):
-            if count == 0:
-                continue
-            slot_start = time_slots[slot_idx]
-            arrivals_in_slot = np.random.uniform(slot_start, slot_start + 10, size=count)
-            all_arrivals.extend(arrivals_in_slot)
-        
-        # Vérification finale (optionnelle)
-        assert len(all_arrivals) == max_pax, f"Erreur: {len(all_arrivals)} arrivées au lieu de {max_pax}"
-        
-        return np.array(all_arrivals)
+        arrivals_per_slot = rng.negative_binomial(n=self.n, p=self.p, size=dans_plage.shape) * dans_plage
+
+        # Normaliser et ajuster pour obtenir exactement max_pax arrivées par vol
+        total = arrivals_per_slot.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            arrivals_per_slot = np.where(total > 0, arrivals_per_slot / total * max_pax[:, None], 0).astype(int)
+        remaining = max_pax - arrivals_per_slot.sum(axis=1)
+
+        # Distribuer les restants dans les tranches du vol aléatoirement
+        vols_restants = np.repeat(np.arange(len(max_pax)), np.where(n_slots > 0, remaining, 0))
+        indices = (rng.random(len(vols_restants)) * n_slots[vols_restants]).astype(int)
+        np.add.at(arrivals_per_slot, (vols_restants, indices), 1)
+
+        # Générer les temps exacts, vol par vol puis tranche par tranche
+        counts = arrivals_per_slot.ravel()
+        flight_idx = np.repeat(np.repeat(np.arange(len(max_pax)), len(tranches)), counts)
+        slot_start = np.repeat((open_time[:, None] + 10 * tranches).ravel(), counts)
+        all_arrivals = slot_start + rng.uniform(0, 10, size=len(slot_start))
+        return all_arrivals, flight_idx
+ #---------------------------------------------------------------------------
+# Classe de simulation associée à chaque type de distribution
+SIMULATIONS = {
+    "uniform": Simulate_uniforme,
+    "normal": Simulate_normale,
+    "poisson": Simulate_poisson,
+    "binomialnegatif": Simulate_binomialnegatif,
+    "beta": Simulate_beta,
+    "bimodal": Simulate_bimodal,
+    "lognormal": Simulate_lognormale,
+    "gamma": Simulate_gamma,
+    "weibull": Simulate_weibull,
+    "trimodal": Simulate_trimodal,
+    "pareto": Simulate_pareto,
+}
+
+def create_simulation(sim_type, params, departures=None, compagnies_info=None, **kwargs):
+    """
+    Crée la simulation du type demandé avec les paramètres de sa distribution
+    (departures, compagnies_info : vols et compagnies déjà chargés, None = lus dans la base)
+    """
+    return SIMULATIONS[sim_type](params, departures=departures, compagnies_info=compagnies_info, **kwargs)
+
+def default_simulation_kwargs(sim_type, params):
+    """Paramètres par défaut (config.json) de la distribution du type demandé"""
+    if sim_type == "normal":
+        return {"sigma_minutes": params.default_sigma}
+    elif sim_type == "poisson":
+        return {"lambda_param": params.default_lambda}
+    elif sim_type == "binomialnegatif":
+        return {"mu": params.default_mu, "k": params.default_k}
+    elif sim_type == "beta":
+        return {"alpha": params.default_alpha, "beta": params.default_beta}
+    elif sim_type == "bimodal":
+        return {
+            "early_mean": params.default_early_mean,
+            "early_std": params.default_early_std,
+            "late_mean": params.default_late_mean,
+            "late_std": params.default_late_std,
+            "early_weight": params.default_early_weight
+        }
+    elif sim_type == "lognormal":
+        return {"mu": params.default_lognormal_mu, "sigma": params.default_lognormal_sigma}
+    elif sim_type == "gamma":
+        return {"shape": params.default_gamma_shape, "scale": params.default_gamma_scale}
+    elif sim_type == "weibull":
+        return {"shape": params.default_weibull_shape, "scale": params.default_weibull_scale}
+    elif sim_type == "trimodal":
+        return {
+            "means": params.default_trimodal_means,
+            "stds": params.default_trimodal_stds,
+            "weights": params.default_trimodal_weights
+        }
+    elif sim_type == "pareto":
+        return {"alpha": params.default_pareto_alpha, "scale": params.default_pareto_scale}
+    return {}
  #---------------------------------------------------------------------------
 
 
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+
+from onda_config import Params
+from onda_benchmark import create_database
+from onda_optimise import OptimiseurGP, evaluer_affectation
+from onda_simulation import Simulate, create_simulation, default_simulation_kwargs
+#-------------------------------------------------------------------------------------------------
+def params_test(db_path):
+    """Paramètres de config.json pour la journée du 2025-04-01 du site GMMX de la base db_path"""
+    params = Params(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"))
+    params.db_path = str(db_path)
+    params.db_cache = False
+    params.site = "GMMX"
+    params.date_str = "2025-04-01"
+    params.compagnies = []
+    params.num_vols = []
+    return params
+
+def simulation_test(tmp_path):
+    """Simulation normale sur une journée d'une base synthétique (carrousels 1 à 5)"""
+    params = params_test(tmp_path / "test.db")
+    create_database(params.db_path, params.site, params.date_str, 1, 60, 150)
+    return create_simulation("normal", params, **default_simulation_kwargs("normal", params))
+
+def test_simulate_delta_nouveau_caroussel(tmp_path):
+    """
+    Un carrousel ajouté par une autre affectation (absent du résultat de référence)
+    est simulé en entier par simulate_delta
+    """
+    sim = simulation_test(tmp_path)
+    demande = sim.sample()
+    ancienne = dict(sim.compagnies)
+    reference = sim.simulate(sim.assign(demande))
+    assert "caroussel_7" not in reference
+
+    compagnies = list(ancienne)
+    sim.init_db_compagnies({**ancienne, compagnies[0]: 7})
+    assert 7 in sim.caroussels
+
+    nouvelle = {**ancienne, compagnies[1]: ancienne[compagnies[1]] % 5 + 1}
+    sim.init_db_compagnies(nouvelle)
+    data = sim.assign(demande)
+    delta = sim.simulate_delta(data, reference, sim.caroussels_modifies(ancienne, nouvelle))
+
+    assert "caroussel_7" in delta
+    assert delta == sim.simulate(data)
+
+# Base de référence : AT200 part deux fois dans la journée (numéro en double), AT100 ouvre
+# l'enregistrement la veille (fenêtre hors journée), AF301 (arrivée) et AF302 (lendemain) sont ignorés
+VOLS_REFERENCE = [
+    ("GMMX", "D", "AT100", "AT", "A320", "2025-04-01 01:30", 12, "C"),
+    ("GMMX", "D", "AT200", "AT", "B737", "2025-04-01 08:00", 20, "C"),
+    ("GMMX", "D", "AF300", "AF", "A320", "2025-04-01 09:20", 15, "C"),
+    ("GMMX", "D", "AT200", "AT", "B737", "2025-04-01 18:40", 18, "C"),
+    ("GMMX", "D", "TO400", "TO", "A320", "2025-04-01 23:50", 10, "C"),
+    ("GMMX", "A", "AF301", "AF", "A320", "2025-04-01 10:00", 30, "C"),
+    ("GMMX", "D", "AF302", "AF", "A320", "2025-04-02 07:00", 30, "C"),
+]
+
+def simulation_reference(tmp_path):
+    """Simulation normale de la base de référence, carrousels 1 et 2 sous-dimensionnés"""
+    params = params_test(tmp_path / "reference.db")
+    conn = sqlite3.connect(params.db_path)
+    with conn:
+        conn.execute("""CREATE TABLE aircraft (Site TEXT, Sens TEXT, NumVol TEXT, Compagnie TEXT, TypeAvion TEXT,
+                        DateHeurePrevue DATETIME, PAXpayants INTEGER, CarVol TEXT)""")
+        conn.execute("CREATE TABLE compagnies (compagnies TEXT, zone TEXT, caroussel INTEGER)")
+        conn.executemany("INSERT INTO compagnies VALUES (?, ?, ?)", [("AT", "A", 1), ("AF", "A", 2), ("TO", "B", 3)])
+        conn.executemany("INSERT INTO aircraft VALUES (?, ?, ?, ?, ?, ?, ?, ?)", VOLS_REFERENCE)
+    conn.close()
+    params.set_capacite(1, max_length=4, processing_rate=0.1)
+    params.set_capacite(2, max_length=4, processing_rate=0.2)
+    return create_simulation("normal", params, **default_simulation_kwargs("normal", params))
+
+def test_reference(tmp_path):
+    """Résultats de run() / simulate() avec la graine de la configuration, comparés à des valeurs enregistrées"""
+    sim = simulation_reference(tmp_path)
+    data = sim.run()
+
+    assert data.numeros == ["AT100", "AT200", "AF300", "TO400"]
+    assert len(data["times"]) == 144
+    assert data["vols"][48] == data["vols"][112] == [["AT200", 1]]
+    assert {i: n for i, n in enumerate(data.nombres("vols").tolist()) if n} == {9: 1, 48: 1, 56: 1, 112: 1, 143: 1}
+    assert data.nombres("enregistrements").sum() == 51
+    assert data.nombres("manutentionnaires").sum() == 81
+    # Un seul voyageur d'AT100 arrive après le début de la journée
+    assert {i: n for i, n in enumerate(data.nombres("voyageurs").tolist()) if n} == {
+        1: 1, 33: 1, 34: 4, 35: 1, 36: 8, 37: 1, 38: 3, 39: 2, 40: 1, 42: 2, 43: 4, 44: 4, 45: 1, 46: 2, 47: 1,
+        96: 1, 97: 2, 98: 2, 99: 5, 100: 2, 101: 2, 102: 3, 103: 1, 128: 2, 129: 3, 130: 1, 131: 2, 133: 1, 135: 1}
+    assert {i: n for i, n in enumerate(data.nombres("bagages").tolist()) if n} == {
+        34: 7, 35: 3, 36: 10, 37: 1, 38: 5, 40: 3, 42: 6, 43: 6, 44: 8, 45: 1, 46: 5, 47: 2,
+        97: 2, 99: 12, 100: 4, 101: 3, 102: 4, 103: 2, 128: 1, 129: 3, 131: 3, 133: 2}
+
+    resultats = sim.simulate(data)
+    assert resultats["nombre_echec"] == 37
+    caroussels = [f"caroussel_{caroussel}" for caroussel in range(1, 6)]
+    assert [resultats[caroussel]["nombre_echec"] for caroussel in caroussels] == [27, 10, 0, 0, 0]
+    assert [max(resultats[caroussel]["Bagages_sur_tapis"]) for caroussel in caroussels] == [21, 16, 0, 0, 0]
+    assert [sum(resultats[caroussel]["Bagages_rejetes"]) for caroussel in caroussels] == [24, 0, 0, 0, 0]
+
+class SimulateParVol(Simulate):
+    """Simulation qui ne redéfinit que distribution() (un vol à la fois)"""
+    def distribution(self, departure_min, open_time, close_time, max_pax, rng):
+        return rng.uniform(open_time, close_time, max_pax)
+
+def test_distribution_par_vol(tmp_path):
+    """Une sous-classe qui ne redéfinit que distribution() est simulée vol par vol"""
+    params = simulation_test(tmp_path).params
+    sim = SimulateParVol(params, "Simulation par vol")
+    data = sim.run()
+    voyageurs = sim.tirage()[1]
+    assert len(voyageurs) == sum(flight.passenger_count for flight in sim.departures)
+    assert 0 < data.nombres("voyageurs").sum() <= len(voyageurs)
+    assert sim.simulate(data)["nombre_echec"] >= 0
+
+def test_optimisation_delta(tmp_path):
+    """Les enfants évalués par delta à partir de leur parent ont la fitness d'une simulation complète"""
+    sim = simulation_test(tmp_path)
+    optimiseur = OptimiseurGP(sim, population_size=6, generations=3, mutation_rate=0.5)
+    optimiseur.run()
+
+    verification = simulation_test(tmp_path)
+    demande = verification.sample()
+    for key, nombre_echec in optimiseur.cache.items():
+        assert evaluer_affectation(verification, demande, dict(key), True) == nombre_echec
+#-------------------------------------------------------------------------------------------------